@@ -0,0 +1,266 @@
+#!/bin/python3
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from statistics import median
+from time import perf_counter
+from typing import Callable
+
+import pygame
+
+from maze import Maze
+from pathfinders import Astar, Bfs, Dfs
+from utils import Algorithms, PathFinder
+
+GENERATORS = {
+    "prim": Algorithms.PRIM,
+    "kruskal": Algorithms.KRUSKAL,
+    "boruvka": Algorithms.BORUVKA,
+    "prim_maze": Algorithms.PRIM_MAZE,
+    "eller": Algorithms.ELLER,
+}
+
+SOLVERS: dict[str, Callable[[Maze], PathFinder]] = {
+    "bfs": Bfs,
+    "dfs": Dfs,
+    "astar": Astar,
+}
+
+
+def new_maze(size: int, seed: int, max_cost: int) -> Maze:
+    return Maze(pygame.Rect(0, 0, size, size), 1, max_cost, seed=seed)
+
+
+class PeakMemory:
+    """
+    Peak of memory allocated by python inside the with block, tracemalloc only
+    runs if enabled so the timed runs are not slowed down
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.peak: int | None = None
+
+    def __enter__(self):
+        if self.enabled:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *_):
+        if self.enabled:
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+# returns the seconds, steps and peak memory (if memory) that alg takes to
+# finish a size x size maze
+def run_generator(
+    alg: Algorithms, size: int, seed: int, memory: bool = False
+) -> tuple[float, int, int | None]:
+    maze = new_maze(size, seed, 1000)
+    with PeakMemory(memory) as peak:
+        maze.set_generation_mode(alg)
+
+        steps = 0
+        start = perf_counter()
+        while not maze.is_fully_created():
+            maze.new_wall()
+            steps += 1
+        seconds = perf_counter() - start
+    return seconds, steps, peak.peak
+
+
+# returns the seconds, steps and peak memory (if memory) that solver takes to
+# reach the target of a finished size x size maze, the maze is built before
+# the timer starts and the memory is traced
+def run_solver(
+    solver: Callable[[Maze], PathFinder], size: int, seed: int, memory: bool = False
+) -> tuple[float, int, int | None]:
+    maze = new_maze(size, seed, 10)
+    maze.set_generation_mode(Algorithms.PRIM_MAZE)
+    maze.generate_all()
+    maze.get_open_directions()
+
+    with PeakMemory(memory) as peak:
+        steps = 0
+        start = perf_counter()
+        path_finder = solver(maze)
+        while not path_finder.has_finished():
+            path_finder.next_step()
+            steps += 1
+        seconds = perf_counter() - start
+    return seconds, steps, peak.peak
+
+
+def measure(
+    name: str,
+    kind: str,
+    run: Callable[[int, int, bool], tuple[float, int, int | None]],
+    size: int,
+    seeds: list[int],
+    memory: bool,
+) -> dict:
+    times, steps = [], []
+    for seed in seeds:
+        seconds, count, _ = run(size, seed, False)
+        times.append(seconds)
+        steps.append(count)
+
+    seconds = median(times)
+    result = {
+        "name": name,
+        "kind": kind,
+        "size": size,
+        "seconds": seconds,
+        "steps": round(median(steps)),
+        "steps_per_second": median(steps) / seconds if seconds else 0.0,
+        "peak_memory": None,
+    }
+    # tracemalloc slows everything down, so the memory is measured in another run
+    if memory:
+        result["peak_memory"] = max(
+            run(size, seed, True)[2] or 0 for seed in seeds
+        )
+    return result
+
+
+# returns the (key, metric, ratio) entries of the results that are slower or
+# use more memory than the baseline by more than tolerance
+def regressions(
+    results: list[dict], baseline: list[dict], tolerance: float
+) -> list[tuple[str, str, float]]:
+    previous = {(r["name"], r["size"]): r for r in baseline}
+    found = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_memory"):
+            if not old.get(metric) or result[metric] is None:
+                continue
+            ratio = result[metric] / old[metric]
+            if ratio > 1 + tolerance:
+                found.append((f"{result['name']} {result['size']}", metric, ratio))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="times the generators and solvers over several grid sizes"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 100, 200], help="cells per side"
+    )
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(GENERATORS) + list(SOLVERS),
+        help="algorithms to run, all of them by default",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the peak memory runs"
+    )
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("-b", "--baseline", default="benchmark_baseline.json")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="slowdown over the baseline that counts as a regression (0.25 = 25%%)",
+    )
+    args = parser.parse_args()
+
+    runs: list[
+        tuple[str, str, Callable[[int, int, bool], tuple[float, int, int | None]]]
+    ] = []
+    for name, alg in GENERATORS.items():
+        runs.append(
+            (
+                name,
+                "generator",
+                lambda size, seed, memory, alg=alg: run_generator(
+                    alg, size, seed, memory
+                ),
+            )
+        )
+    for name, solver in SOLVERS.items():
+        runs.append(
+            (
+                name,
+                "solver",
+                lambda size, seed, memory, solver=solver: run_solver(
+                    solver, size, seed, memory
+                ),
+            )
+        )
+
+    results = []
+    for name, kind, run in runs:
+        if args.only and name not in args.only:
+            continue
+        for size in args.sizes:
+            result = measure(name, kind, run, size, args.seeds, not args.no_memory)
+            results.append(result)
+            memory = (
+                f"{result['peak_memory'] / 2**20:8.2f} MiB"
+                if result["peak_memory"] is not None
+                else ""
+            )
+            print(
+                f"{name:>10} {size:>5}x{size:<5} {result['seconds']:9.4f}s "
+                f"{result['steps_per_second']:12.0f} steps/s {memory}"
+            )
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seeds": args.seeds,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        return
+
+    if not os.path.exists(args.baseline):
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    # other seeds make other mazes, so the results can't be compared
+    if baseline.get("seeds") != report["seeds"]:
+        print(
+            f"not comparing with {args.baseline}, it was run with the seeds "
+            f"{baseline.get('seeds')}"
+        )
+        return
+    for key in ("python", "machine"):
+        if baseline.get(key) != report[key]:
+            print(
+                f"warning: {args.baseline} was run with {key} {baseline.get(key)}, "
+                f"the times may not be comparable"
+            )
+
+    found = regressions(results, baseline["results"], args.tolerance)
+    for key, metric, ratio in found:
+        print(f"regression: {key} {metric} x{ratio:.2f} over the baseline")
+    if found:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from array import array
+
+import numpy as np
+
+
+class DistanceField:
+    """
+    Distances from the cell source to every cell of a finished maze, found with
+    a single BFS and kept in compact arrays indexed by cell id:
+        distance[c]: number of moves from source to c, -1 if c can't be reached,
+        parent[c]: cell before c in the path from source to c (source for source),
+    """
+
+    def __init__(
+        self,
+        open_directions: bytearray,
+        direction_offsets: list[tuple[int, ...]],
+        source: int,
+    ):
+        cell_count = len(open_directions)
+        distance = array("i", [-1]) * cell_count
+        parent = array("i", [-1]) * cell_count
+        distance[source] = 0
+        parent[source] = source
+
+        queue = [source]
+        for cell in queue:
+            for offset in direction_offsets[open_directions[cell]]:
+                neighbour = cell + offset
+                if distance[neighbour] == -1:
+                    distance[neighbour] = distance[cell] + 1
+                    parent[neighbour] = cell
+                    queue.append(neighbour)
+
+        # the arrays are kept once, parent_array for path_to and the numpy
+        # views over the same memory for everything else
+        self.source = source
+        self.parent_array = parent
+        self.distance = np.frombuffer(distance, dtype=np.int32)
+        self.parent = np.frombuffer(parent, dtype=np.int32)
+        self.max_distance = int(self.distance.max())
+
+    def distance_to(self, cell: int) -> int:
+        return int(self.distance[cell])
+
+    # cell ids of the path from source to cell, both included
+    def path_to(self, cell: int) -> list[int]:
+        if self.distance[cell] == -1:
+            return []
+
+        parent = self.parent_array
+        path = [cell]
+        while cell != self.source:
+            cell = parent[cell]
+            path.append(cell)
+        path.reverse()
+        return path
@@ -0,0 +1,115 @@
+#!/bin/python3
+
+import argparse
+import os
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+from generators import MazeGenerator
+from maze import Maze
+from maze_file import stream_eller_maze
+from utils import Algorithms
+
+
+def generated_arrays(maze: Maze) -> dict[str, np.ndarray]:
+    match maze.generation_mode:
+        case Algorithms.PRIM:
+            assert maze.prim is not None
+            edges = [(p, v) for v, p in enumerate(maze.prim.parents) if p != v]
+        case Algorithms.KRUSKAL:
+            assert maze.kruskal is not None
+            edges = [(v, w) for v, w, _ in maze.kruskal.selected_edges]
+        case Algorithms.BORUVKA:
+            assert maze.boruvka is not None
+            edges = [(v, w) for v, w, _ in maze.boruvka.boruvka_walls]
+        case Algorithms.PRIM_MAZE | Algorithms.ELLER:
+            assert isinstance(maze.curr_alg, MazeGenerator)
+            return {
+                "horizontal": maze.curr_alg.selected_walls.horizontal.to_array(),
+                "vertical": maze.curr_alg.selected_walls.vertical.to_array(),
+            }
+
+    return {"edges": np.array(edges, dtype=np.int64).reshape(-1, 2)}
+
+
+def generate(
+    alg: Algorithms, rows: int, columns: int, seed: int, max_cost: int = 10
+) -> Maze:
+    maze = Maze(
+        pygame.Rect(0, 0, columns, rows), 1, max_cost, seed=seed, algorithm=alg
+    )
+    maze.generate_all()
+    return maze
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="generates mazes or MSTs without opening a window"
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        choices=[alg.name.lower() for alg in Algorithms],
+        default=Algorithms.PRIM_MAZE.name.lower(),
+    )
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("-r", "--rows", type=int, default=50)
+    parser.add_argument("-c", "--columns", type=int, default=50)
+    parser.add_argument("--max-cost", type=int, default=10)
+    parser.add_argument(
+        "-s", "--seed", type=int, help="seed of the first maze, the n-th uses seed + n"
+    )
+    parser.add_argument("-o", "--output", default="mazes")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="write eller mazes row by row to .maze files, they can exceed the RAM",
+    )
+    args = parser.parse_args()
+
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    alg = Algorithms[args.algorithm.upper()]
+    if args.stream and alg != Algorithms.ELLER:
+        parser.error("only eller mazes can be streamed")
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+    os.makedirs(args.output, exist_ok=True)
+
+    total = 0.0
+    for n in range(args.count):
+        if args.stream:
+            start = perf_counter()
+            stream_eller_maze(
+                os.path.join(args.output, f"{args.algorithm}_{seed + n}.maze"),
+                args.rows,
+                args.columns,
+                seed + n,
+            )
+            total += perf_counter() - start
+            continue
+
+        start = perf_counter()
+        maze = generate(alg, args.rows, args.columns, seed + n, args.max_cost)
+        total += perf_counter() - start
+
+        np.savez_compressed(
+            os.path.join(args.output, f"{args.algorithm}_{seed + n}.npz"),
+            algorithm=args.algorithm,
+            seed=str(seed + n),
+            rows=args.rows,
+            columns=args.columns,
+            **generated_arrays(maze),
+        )
+
+    cells = args.count * args.rows * args.columns
+    print(
+        f"{args.count} {args.algorithm} mazes of {args.rows}x{args.columns} "
+        f"in {total:.3f}s ({args.count / total:.2f} mazes/s, "
+        f"{cells / total:.0f} cells/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,49 @@
-from math import inf
-from random import randint
+import heapq
+from random import Random
 
+import numpy as np
 import pygame
 
-
-def get_graph_edges(graph: list[list[int]]) -> list[tuple[int, int, int]]:
-    edges = []
-    for i in range(len(graph)):
-        for j in range(i, len(graph[i])):
-            if graph[i][j]:
-                edges.append((i, j, graph[i][j]))
-
-    return edges
+import pixel_renderer
+from graph import DisjointSet, GridGraph
+from utils import Algorithms
+from walls import MazeWalls
+
+
+def draw_edge(
+    surface: pygame.Surface,
+    edge: tuple[int, int],
+    xnode_count: int,
+    cell_size: int,
+    rect: pygame.Rect,
+    color: pygame.Color,
+) -> pygame.Rect:
+    from_node = (
+        edge[0] % xnode_count * cell_size + rect.x,
+        edge[0] // xnode_count * cell_size + rect.y,
+    )
+    to_node = (
+        edge[1] % xnode_count * cell_size + rect.x,
+        edge[1] // xnode_count * cell_size + rect.y,
+    )
+    return pygame.draw.line(surface, color, from_node, to_node)
+
+
+# returns the horizontal and vertical segments masks of pixel_renderer.draw_lines
+# with the edges of a grid graph, edges = array with the (u, v) edges
+def edges_to_lines(
+    edges: np.ndarray, xnode_count: int, ynode_count: int
+) -> tuple[np.ndarray, np.ndarray]:
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    u, v = edges.min(axis=1), edges.max(axis=1)
+    horizontal = np.zeros((ynode_count, xnode_count - 1), dtype=bool)
+    vertical = np.zeros((ynode_count - 1, xnode_count), dtype=bool)
+
+    is_horizontal = v - u == 1
+    u_horizontal = u[is_horizontal]
+    horizontal.flat[u_horizontal - u_horizontal // xnode_count] = True
+    vertical.flat[u[(v - u) == xnode_count]] = True
+    return horizontal, vertical
 
 
 class Generator:
@@ -21,6 +53,11 @@ class Generator:
     def new_wall(self):
         raise NotImplementedError
 
+    # runs the algorithm to the end, subclasses override it with a faster loop
+    def generate_all(self):
+        while not self.finished():
+            self.new_wall()
+
     def reset(self):
         raise NotImplementedError
 
@@ -34,35 +71,126 @@ class Generator:
     ):
         raise NotImplementedError
 
+    # draws only what changed since the last call to draw or draw_changes and
+    # returns the rects of surface that were modified
+    def draw_changes(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ) -> list[pygame.Rect]:
+        raise NotImplementedError
+
+    # number of changes not drawn yet by draw or draw_changes
+    def undrawn(self) -> int:
+        raise NotImplementedError
+
+    # horizontal and vertical segments masks of pixel_renderer.draw_lines with
+    # everything draw would draw
+    def lines(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.lines_since(0)
+
+    # same as lines but only with the changes from the start-th one on
+    def lines_since(self, start: int) -> tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    # same as draw but writing the pixels directly, for small cell sizes
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+    ):
+        pixel_renderer.draw_lines(surface, *self.lines(), cell_size, rect, color)
+        self.drawn += self.undrawn()
+
+    # same as draw_changes but writing the pixels directly, the generators that
+    # only add edges draw just the ones that are not drawn yet
+    def draw_pixel_changes(
+        self,
+        surface: pygame.Surface,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ):
+        pixel_renderer.draw_lines(
+            surface, *self.lines_since(self.drawn), cell_size, rect, color
+        )
+        self.drawn += self.undrawn()
+
 
 class Prim(Generator):
-    def __init__(self, graph: list[list[int]]):
+    def __init__(self, graph: GridGraph, rng: Random | None = None):
         self.grid_graph = graph
-        self.root = randint(0, len(self.grid_graph) - 1)
-        self.cost = [i if i else inf for i in self.grid_graph[self.root]]
-        self.parents = [self.root if i else None for i in self.grid_graph[self.root]]
+        self.rng = rng if rng is not None else Random()
+        self.root = self.rng.randint(0, len(self.grid_graph) - 1)
+        self.parents: list[int | None] = [None] * len(self.grid_graph)
         self.q = [False] * len(self.grid_graph)
         self.q[self.root] = True
         self.parents[self.root] = self.root
-        self.prim_walls = 0
+        # nodes in the order they were added to the tree
+        self.tree = [self.root]
+        self.drawn = 0
+        # lazy priority queue of (cost, node, parent), the entries of the nodes
+        # that are already in the tree are skipped when popped
+        self.heap = [
+            (w, n, self.root) for n, w in self.grid_graph.neighbours(self.root)
+        ]
+        heapq.heapify(self.heap)
+        self.prim_walls = 1
 
     def finished(self):
         return self.prim_walls == len(self.grid_graph)
 
     def new_wall(self):
-        v = self.cost.index(min(self.cost))
-        self.cost[v] = inf
-        self.q[v] = True
-        self.prim_walls += 1
-
-        for n in range(len(self.grid_graph[v])):
-            if (
-                self.grid_graph[v][n] < self.cost[n]
-                and not self.q[n]
-                and self.grid_graph[v][n]
-            ):
-                self.parents[n] = v
-                self.cost[n] = self.grid_graph[v][n]
+        while self.heap:
+            _, v, parent = heapq.heappop(self.heap)
+            if self.q[v]:
+                continue
+
+            self.q[v] = True
+            self.parents[v] = parent
+            self.tree.append(v)
+            self.prim_walls += 1
+
+            for n, w in self.grid_graph.neighbours(v):
+                if not self.q[n]:
+                    heapq.heappush(self.heap, (w, n, v))
+            return
+
+    # same steps as new_wall with the neighbours of every node computed inline
+    def generate_all(self):
+        xnode_count = self.grid_graph.xnode_count
+        ynode_count = self.grid_graph.ynode_count
+        horizontal = self.grid_graph.horizontal.tolist()
+        vertical = self.grid_graph.vertical.tolist()
+        heap, q, parents = self.heap, self.q, self.parents
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        while heap:
+            _, v, parent = heappop(heap)
+            if q[v]:
+                continue
+
+            q[v] = True
+            parents[v] = parent
+            self.tree.append(v)
+            self.prim_walls += 1
+
+            i, j = divmod(v, xnode_count)
+            if i > 0 and not q[v - xnode_count]:
+                heappush(heap, (vertical[v - xnode_count], v - xnode_count, v))
+            if j > 0 and not q[v - 1]:
+                heappush(heap, (horizontal[v - i - 1], v - 1, v))
+            if i < ynode_count - 1 and not q[v + xnode_count]:
+                heappush(heap, (vertical[v], v + xnode_count, v))
+            if j < xnode_count - 1 and not q[v + 1]:
+                heappush(heap, (horizontal[v - i], v + 1, v))
 
     def draw(
         self,
@@ -72,58 +200,94 @@ class Prim(Generator):
         rect: pygame.Rect,
         color: pygame.Color,
     ):
-        for i, v in enumerate(self.parents):
-            if v is None or not self.q[i]:
-                continue
-            from_node = (
-                v % xnode_count * cell_size + rect.x,
-                v // xnode_count * cell_size + rect.y,
+        for v in self.tree:
+            draw_edge(
+                surface, (self.parents[v], v), xnode_count, cell_size, rect, color
             )
-            to_node = (
-                i % xnode_count * cell_size + rect.x,
-                i // xnode_count * cell_size + rect.y,
+        self.drawn = len(self.tree)
+
+    def draw_changes(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ) -> list[pygame.Rect]:
+        dirty = [
+            draw_edge(
+                surface, (self.parents[v], v), xnode_count, cell_size, rect, color
             )
-            pygame.draw.line(surface, color, from_node, to_node)
+            for v in self.tree[self.drawn :]
+        ]
+        self.drawn = len(self.tree)
+        return dirty
+
+    def undrawn(self) -> int:
+        return len(self.tree) - self.drawn
+
+    def lines_since(self, start: int) -> tuple[np.ndarray, np.ndarray]:
+        # the root has no edge to its parent
+        vertices = self.tree[max(start, 1) :]
+        tree = np.array(vertices, dtype=np.int64)
+        parents = np.array([self.parents[v] for v in vertices], dtype=np.int64)
+        return edges_to_lines(
+            np.stack((parents, tree), axis=1),
+            self.grid_graph.xnode_count,
+            self.grid_graph.ynode_count,
+        )
 
     def restart(self):
-        self.root = randint(0, len(self.grid_graph) - 1)
-        self.cost = [i if i else inf for i in self.grid_graph[self.root]]
-        self.parents = [self.root if i else None for i in self.grid_graph[self.root]]
+        self.root = self.rng.randint(0, len(self.grid_graph) - 1)
+        self.parents = [None] * len(self.grid_graph)
         self.q = [False] * len(self.grid_graph)
         self.q[self.root] = True
         self.parents[self.root] = self.root
-        self.prim_walls = 0
+        self.tree = [self.root]
+        self.drawn = 0
+        self.heap = [
+            (w, n, self.root) for n, w in self.grid_graph.neighbours(self.root)
+        ]
+        heapq.heapify(self.heap)
+        self.prim_walls = 1
 
 
 class Kruskal(Generator):
-    def __init__(self, graph: list[list[int]]):
+    def __init__(self, graph: GridGraph):
         self.grid_graph = graph
-        self.edges = get_graph_edges(self.grid_graph)
-        self.edges.sort(key=lambda edge: edge[2])
-        self.sets = list(range(len(self.grid_graph)))
-        self.replace_set = None
+        self.edges = self.grid_graph.edge_index
+        self.sets = DisjointSet(len(self.grid_graph))
         self.edge = 0
         self.selected_edges: list[tuple[int, int, int]] = []
+        self.drawn = 0
 
     def finished(self):
         return len(self.selected_edges) == len(self.grid_graph) - 1
 
-    def union(self, union_set, child_set):
-        for i in range(len(self.sets)):
-            if self.sets[i] == child_set:
-                self.sets[i] = union_set
-
     def new_wall(self):
         while self.edge < len(self.edges):
             edge = self.edges[self.edge]
-            if self.sets[edge[0]] != self.sets[edge[1]]:
-                self.replace_set = self.sets[edge[1]]
-                self.union(self.sets[edge[0]], self.sets[edge[1]])
+            self.edge += 1
+            if self.sets.union(edge[0], edge[1]):
                 self.selected_edges.append(edge)
-                self.edge += 1
+                break
+
+    def generate_all(self):
+        edges = zip(
+            self.edges.u[self.edge :].tolist(),
+            self.edges.v[self.edge :].tolist(),
+            self.edges.w[self.edge :].tolist(),
+        )
+        remaining = len(self.grid_graph) - 1 - len(self.selected_edges)
+        for edge in edges:
+            if not remaining:
                 break
 
             self.edge += 1
+            if self.sets.union(edge[0], edge[1]):
+                self.selected_edges.append(edge)
+                remaining -= 1
 
     def draw(
         self,
@@ -133,95 +297,231 @@ class Kruskal(Generator):
         rect: pygame.Rect,
         color: pygame.Color,
     ):
-        for i in self.selected_edges:
-            from_node = (
-                i[0] % xnode_count * cell_size + rect.x,
-                i[0] // xnode_count * cell_size + rect.y,
-            )
-            to_node = (
-                i[1] % xnode_count * cell_size + rect.x,
-                i[1] // xnode_count * cell_size + rect.y,
-            )
-            pygame.draw.line(surface, color, from_node, to_node)
+        for edge in self.selected_edges:
+            draw_edge(surface, edge[:2], xnode_count, cell_size, rect, color)
+        self.drawn = len(self.selected_edges)
+
+    def draw_changes(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ) -> list[pygame.Rect]:
+        dirty = [
+            draw_edge(surface, edge[:2], xnode_count, cell_size, rect, color)
+            for edge in self.selected_edges[self.drawn :]
+        ]
+        self.drawn = len(self.selected_edges)
+        return dirty
+
+    def undrawn(self) -> int:
+        return len(self.selected_edges) - self.drawn
+
+    def lines_since(self, start: int) -> tuple[np.ndarray, np.ndarray]:
+        edges = np.array(self.selected_edges[start:], dtype=np.int64).reshape(-1, 3)
+        return edges_to_lines(
+            edges[:, :2], self.grid_graph.xnode_count, self.grid_graph.ynode_count
+        )
 
     def restart(self):
-        self.sets = list(range(len(self.grid_graph)))
-        self.replace_set = None
+        self.sets = DisjointSet(len(self.grid_graph))
         self.edge = 0
         self.selected_edges = []
+        self.drawn = 0
 
 
 class Boruvka(Generator):
-    def __init__(self, graph: list[list[int]]):
+    def __init__(self, graph: GridGraph):
         self.grid_graph = graph
-        self.edges = get_graph_edges(self.grid_graph)
-        self.components = list(range(len(self.grid_graph)))
-        self.component_count = len(self.components)
-        self.rank = [0] * len(self.grid_graph)
-        self.cheapest = [None] * len(self.grid_graph)
+        self.edges = self.grid_graph.edge_index
+        self.components = DisjointSet(len(self.grid_graph))
+        # component of every node at the start of the current round
+        self.labels = np.arange(len(self.grid_graph))
+        # positions in self.edges of the edges selected in the current round
+        self.cheapest: list[int] = []
         self.boruvka_walls: list[tuple[int, int, int]] = []
+        self.drawn = 0
         self.curr_comp = 0
-        self.is_finished = False
 
     def finished(self):
-        return self.is_finished
+        return len(self.boruvka_walls) == len(self.grid_graph) - 1
+
+    # returns the position of the cheapest outgoing edge of every component, or
+    # len(self.edges) for the labels that are not a component
+    def cheapest_edges(self, labels: np.ndarray) -> np.ndarray:
+        componentsu = labels[self.edges.u]
+        componentsv = labels[self.edges.v]
+        outgoing = np.flatnonzero(componentsu != componentsv)
+
+        # the edges are sorted by weight, so the cheapest edge of a component is
+        # the one with the lowest position, this also breaks ties consistently
+        cheapest = np.full(len(self.grid_graph), len(self.edges))
+        np.minimum.at(cheapest, componentsu[outgoing], outgoing)
+        np.minimum.at(cheapest, componentsv[outgoing], outgoing)
+        return cheapest
+
+    # contracts the components merged with the union-find since the last round
+    def contract(self):
+        labels, inverse = np.unique(self.labels, return_inverse=True)
+        roots = np.array([self.components.find(c) for c in labels.tolist()])
+        self.labels = roots[inverse.ravel()]
+
+    def new_round(self):
+        self.contract()
+        cheapest = self.cheapest_edges(self.labels)
+        self.cheapest = np.unique(cheapest[cheapest < len(self.edges)]).tolist()
+        self.curr_comp = 0
+
+    def new_wall(self):
+        if self.finished():
+            return
 
-    # v -> v union w
-    def union(self, componentv: int, componentw: int):
-        for i in range(len(self.components)):
-            self.components[i] = (
-                componentv if self.components[i] == componentw else self.components[i]
+        if self.curr_comp == len(self.cheapest):
+            self.new_round()
+
+        v, w, c = self.edges[self.cheapest[self.curr_comp]]
+        self.components.union(v, w)
+        self.boruvka_walls.append((v, w, c))
+        self.curr_comp += 1
+
+    # contracts whole rounds with pointer jumping instead of one union per edge
+    def generate_all(self):
+        for position in self.cheapest[self.curr_comp :]:
+            v, w, c = self.edges[position]
+            self.components.union(v, w)
+            self.boruvka_walls.append((v, w, c))
+        self.curr_comp = len(self.cheapest)
+        self.contract()
+
+        labels = self.labels
+        while not self.finished():
+            cheapest = self.cheapest_edges(labels)
+            components = np.flatnonzero(cheapest < len(self.edges))
+            edges = cheapest[components]
+
+            # every component points to the one at the other end of its cheapest
+            # edge, two components that chose the same edge point to each other
+            # and the smallest one becomes the root of the merged component
+            endsu = labels[self.edges.u[edges]]
+            other = np.where(endsu == components, labels[self.edges.v[edges]], endsu)
+            successor = np.arange(len(self.grid_graph))
+            successor[components] = other
+            roots = components[(successor[other] == components) & (components < other)]
+            successor[roots] = roots
+            while not np.array_equal(jumped := successor[successor], successor):
+                successor = jumped
+            labels = successor[labels]
+
+            edges = np.unique(edges)
+            self.boruvka_walls.extend(
+                zip(
+                    self.edges.u[edges].tolist(),
+                    self.edges.v[edges].tolist(),
+                    self.edges.w[edges].tolist(),
+                )
             )
+        self.labels = labels
 
-    def new_wall(self):
-        if self.curr_comp == self.component_count:
-            self.cheapest = [None] * self.component_count
-            self.curr_comp = 0
+    def draw(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+    ):
+        for edge in self.boruvka_walls:
+            draw_edge(surface, edge[:2], xnode_count, cell_size, rect, color)
+        self.drawn = len(self.boruvka_walls)
 
-            for v, w, c in self.edges:
-                componentv = self.components[v]
-                componentw = self.components[w]
+    def draw_changes(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ) -> list[pygame.Rect]:
+        dirty = [
+            draw_edge(surface, edge[:2], xnode_count, cell_size, rect, color)
+            for edge in self.boruvka_walls[self.drawn :]
+        ]
+        self.drawn = len(self.boruvka_walls)
+        return dirty
+
+    def undrawn(self) -> int:
+        return len(self.boruvka_walls) - self.drawn
+
+    def lines_since(self, start: int) -> tuple[np.ndarray, np.ndarray]:
+        edges = np.array(self.boruvka_walls[start:], dtype=np.int64).reshape(-1, 3)
+        return edges_to_lines(
+            edges[:, :2], self.grid_graph.xnode_count, self.grid_graph.ynode_count
+        )
 
-                if componentv == componentw:
-                    continue
+    def restart(self):
+        self.components = DisjointSet(len(self.grid_graph))
+        self.labels = np.arange(len(self.grid_graph))
+        self.cheapest = []
+        self.boruvka_walls = []
+        self.drawn = 0
+        self.curr_comp = 0
 
-                if (
-                    self.cheapest[componentv] is None
-                    or self.cheapest[componentv][2] > c
-                ):
-                    self.cheapest[componentv] = (v, w, c)
 
-                if (
-                    self.cheapest[componentw] is None
-                    or self.cheapest[componentw][2] > c
-                ):
-                    self.cheapest[componentw] = (v, w, c)
+class Frontier:
+    """
+    Bag of items with O(1) insertion and O(1) removal of a random item, the
+    removed item is swapped with the last one so the list never shifts
+    """
 
-            if all([i is None for i in self.cheapest]):
-                self.is_finished = True
-                return
+    def __init__(self, rng: Random, items: list | None = None):
+        self.rng = rng
+        self.items = items if items is not None else []
 
-        while self.cheapest[self.curr_comp] is None:
-            self.curr_comp += 1
-            if self.curr_comp == self.component_count:
-                return
+    def __len__(self) -> int:
+        return len(self.items)
 
-        v, w, c = self.cheapest[self.curr_comp]
-        self.boruvka_walls.append((v, w, c))
-        componentv = self.components[v]
-        componentw = self.components[w]
+    def extend(self, items: list):
+        self.items.extend(items)
 
-        if self.rank[componentv] > self.rank[componentw]:
-            self.union(componentv, componentw)
+    def pop_random(self):
+        i = self.rng.randrange(len(self.items))
+        self.items[i], self.items[-1] = self.items[-1], self.items[i]
+        return self.items.pop()
 
-        elif self.rank[componentw] > self.rank[componentv]:
-            self.union(componentw, componentv)
 
+class MazeGenerator(Generator):
+    """
+    Generator of mazes, it takes down walls of selected_walls (a MazeWalls)
+    until every cell can be reached, the finished maze can be solved. The walls
+    are taken down with remove_wall, which keeps them in removed_walls until
+    they are erased by the next draw.
+    """
+
+    selected_walls: MazeWalls
+    removed_walls: list[tuple[int, int]]
+    xnode_count: int
+
+    # wall = (n, m) nodes at the ends of the wall
+    def take_down(self, wall: tuple[int, int]):
+        i, j = divmod(wall[0], self.xnode_count)
+        if wall[1] - wall[0] == 1:
+            self.selected_walls.horizontal.clear(i, j)
         else:
-            self.union(componentv, componentw)
-            self.rank[componentv] += 1
+            self.selected_walls.vertical.clear(i, j)
 
-        self.curr_comp += 1
+    def remove_wall(self, wall: tuple[int, int]):
+        self.take_down(wall)
+        self.removed_walls.append(wall)
+
+    # nothing is drawn meanwhile, so the removed walls are not kept
+    def generate_all(self):
+        while not self.finished():
+            self.new_wall()
+            self.removed_walls.clear()
 
     def draw(
         self,
@@ -231,47 +531,103 @@ class Boruvka(Generator):
         rect: pygame.Rect,
         color: pygame.Color,
     ):
-        for i in self.boruvka_walls:
-            from_node = (
-                i[0] % xnode_count * cell_size + rect.x,
-                i[0] // xnode_count * cell_size + rect.y,
-            )
-            to_node = (
-                i[1] % xnode_count * cell_size + rect.x,
-                i[1] // xnode_count * cell_size + rect.y,
-            )
-            pygame.draw.line(surface, color, from_node, to_node)
+        self.selected_walls.draw(surface, cell_size, rect, color)
+        self.removed_walls.clear()
 
-    def restart(self):
-        self.components = list(range(len(self.grid_graph)))
-        self.component_count = len(self.components)
-        self.rank = [0] * len(self.grid_graph)
-        self.cheapest = [None] * len(self.grid_graph)
-        self.boruvka_walls = []
-        self.curr_comp = 0
-        self.is_finished = False
+    def draw_changes(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ) -> list[pygame.Rect]:
+        dirty = []
+        for wall in self.removed_walls:
+            i, j = divmod(wall[0], xnode_count)
+            x, y = j * cell_size + rect.x, i * cell_size + rect.y
+            # the ends of the wall are erased only if no other wall uses them
+            if wall[1] - wall[0] == 1:
+                dirty.append(pygame.Rect(x, y, cell_size + 1, 1))
+                surface.fill(background, (x + 1, y, cell_size - 1, 1))
+                ends = ((i, j), (x, y)), ((i, j + 1), (x + cell_size, y))
+            else:
+                dirty.append(pygame.Rect(x, y, 1, cell_size + 1))
+                surface.fill(background, (x, y + 1, 1, cell_size - 1))
+                ends = ((i, j), (x, y)), ((i + 1, j), (x, y + cell_size))
+
+            for node, pos in ends:
+                if not self.selected_walls.touches_node(*node):
+                    surface.set_at(pos, background)
+
+        self.removed_walls.clear()
+        return dirty
+
+    def undrawn(self) -> int:
+        return len(self.removed_walls)
+
+    def lines(self) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            self.selected_walls.horizontal.to_array(),
+            self.selected_walls.vertical.to_array(),
+        )
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+    ):
+        pixel_renderer.draw_lines(surface, *self.lines(), cell_size, rect, color)
+        self.removed_walls.clear()
 
+    # the walls are taken down, not added, so everything is drawn again
+    def draw_pixel_changes(
+        self,
+        surface: pygame.Surface,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ):
+        surface.fill(background)
+        self.draw_pixels(surface, cell_size, rect, color)
+
+    def theres_wall(self, cell1: tuple[int, int], cell2: tuple[int, int]) -> bool:
+        return self.selected_walls.theres_wall(cell1, cell2)
 
-class PrimMaze(Generator):
-    def __init__(self, grid: list[list[int]], xnode_count: int, ynode_count: int):
+
+class PrimMaze(MazeGenerator):
+    def __init__(
+        self,
+        grid: GridGraph,
+        xnode_count: int,
+        ynode_count: int,
+        rng: Random | None = None,
+    ):
         self.grid = grid
+        self.rng = rng if rng is not None else Random()
         self.cell_dims = (ynode_count - 1, xnode_count - 1)  # (rows, columns)
         self.xnode_count = xnode_count
         self.ynode_count = ynode_count
-        self.walls = self.cell_walls((0, 0))
-        self.visited_cells: set[tuple[int, int]] = set([(0, 0)])
-        self.grid_walls = set([(v, w) for v, w, _ in get_graph_edges(self.grid)])
-        self.selected_walls = self.grid_walls.copy()
-        self.selected_walls.remove((0, 1))
-        self.selected_walls.remove((len(grid) - 2, len(grid) - 1))
+        self.walls = Frontier(self.rng, self.cell_walls((0, 0)))
+        # visited_cells[i * columns + j] = 1 if the cell (i, j) was visited
+        self.visited_cells = bytearray(self.cell_dims[0] * self.cell_dims[1])
+        self.visited_cells[0] = 1
+        self.selected_walls = MazeWalls(*self.cell_dims)
+        self.selected_walls.fill()
+        # walls removed since the last draw, to erase them
+        self.removed_walls: list[tuple[int, int]] = []
+        self.remove_wall((0, 1))
+        self.remove_wall((len(grid) - 2, len(grid) - 1))
 
     # cell = i, j coords of the cell (i = row, j = column)
     def cell_walls(self, cell: tuple[int, int]) -> list[tuple[int, int]]:
         n = cell[0] * self.xnode_count + cell[1]
-        walls = [(n, i) for i in range(n + 1, len(self.grid[0])) if self.grid[n][i]]
-        n = (cell[0] + 1) * self.xnode_count + cell[1] + 1
-        walls += [(i, n) for i in range(n) if self.grid[n][i]]
-        return walls
+        m = n + self.xnode_count
+        return [(n, m), (n, n + 1), (n + 1, m + 1), (m, m + 1)]
 
     def splited_cells(
         self, wall: tuple[int, int]
@@ -291,31 +647,200 @@ class PrimMaze(Generator):
 
         return cell1, cell2
 
+    def visit(self, cell: tuple[int, int]):
+        self.visited_cells[cell[0] * self.cell_dims[1] + cell[1]] = 1
+
+    def visited(self, cell: tuple[int, int]) -> bool:
+        return bool(self.visited_cells[cell[0] * self.cell_dims[1] + cell[1]])
+
     def new_wall(self):
         if not self.walls:
             return
 
-        wall = self.walls.pop(randint(0, len(self.walls) - 1))
+        wall = self.walls.pop_random()
         cells = self.splited_cells(wall)
 
         if cells[0] is None:
             return
         if cells[1] is None:
-            self.visited_cells.add(cells[0])
+            self.visit(cells[0])
             return
 
-        if cells[0] not in self.visited_cells:
-            self.selected_walls.remove(wall)
-            self.visited_cells.add(cells[0])
+        if not self.visited(cells[0]):
+            self.remove_wall(wall)
+            self.visit(cells[0])
             self.walls.extend(self.cell_walls(cells[0]))
-        elif cells[1] not in self.visited_cells:
-            self.selected_walls.remove(wall)
-            self.visited_cells.add(cells[1])
+        elif not self.visited(cells[1]):
+            self.remove_wall(wall)
+            self.visit(cells[1])
             self.walls.extend(self.cell_walls(cells[1]))
 
+    # same steps as new_wall with the cells split by every wall computed inline
+    def generate_all(self):
+        xnode_count = self.xnode_count
+        rows, columns = self.cell_dims
+        walls, visited = self.walls, self.visited_cells
+
+        while walls:
+            wall = walls.pop_random()
+            i, j = divmod(wall[0], xnode_count)
+            if i >= rows or j >= columns:
+                continue
+
+            k = i * columns + j
+            if wall[1] - wall[0] == 1:
+                if i == 0:
+                    visited[k] = 1
+                    continue
+                other = i - 1, j
+                other_k = k - columns
+            else:
+                if j == 0:
+                    visited[k] = 1
+                    continue
+                other = i, j - 1
+                other_k = k - 1
+
+            if not visited[k]:
+                cell, cell_k = (i, j), k
+            elif not visited[other_k]:
+                cell, cell_k = other, other_k
+            else:
+                continue
+
+            self.take_down(wall)
+            visited[cell_k] = 1
+            walls.extend(self.cell_walls(cell))
+        self.removed_walls.clear()
+
     def finished(self) -> bool:
         return not bool(self.walls)
 
+    def restart(self):
+        self.walls = Frontier(self.rng, self.cell_walls((0, 0)))
+        self.visited_cells = bytearray(len(self.visited_cells))
+        self.visited_cells[0] = 1
+        self.selected_walls.fill()
+        self.removed_walls = []
+        self.remove_wall((0, 1))
+        self.remove_wall((len(self.grid) - 2, len(self.grid) - 1))
+
+
+class EllerRows:
+    """
+    Eller's algorithm, it makes a maze of rows x columns cells one row at a time
+    and only keeps the set of every cell of the current row (the cells that are
+    connected through the rows made so far share their set).
+    next_row() returns the columns j of the cells (i, j) of the new row i whose
+    left wall was taken down and the ones whose wall below was taken down.
+    """
+
+    def __init__(self, rows: int, columns: int, rng: Random | None = None):
+        self.rows = rows
+        self.columns = columns
+        self.rng = rng if rng is not None else Random()
+        self.row = 0
+        self.sets = list(range(self.columns))
+
+    def finished(self) -> bool:
+        return self.row == self.rows
+
+    def next_row(self) -> tuple[list[int], list[int]]:
+        rng = self.rng
+        last = self.row == self.rows - 1
+        self.row += 1
+
+        # joins adjacent cells of different sets, all of them in the last row
+        sets = DisjointSet(self.columns)
+        left = []
+        for j in range(1, self.columns):
+            if (last or rng.random() < 0.5) and sets.union(
+                self.sets[j - 1], self.sets[j]
+            ):
+                left.append(j)
+        row_sets = [sets.find(s) for s in self.sets]
+        if last:
+            return left, []
+
+        # every set goes down through one of its cells at least
+        members: dict[int, list[int]] = {}
+        for j, s in enumerate(row_sets):
+            members.setdefault(s, []).append(j)
+        down = []
+        for cells in members.values():
+            down.extend([j for j in cells if rng.random() < 0.5] or [rng.choice(cells)])
+        down.sort()
+
+        # the cells below keep the set of the cell above or get an unused one
+        self.sets = [-1] * self.columns
+        for j in down:
+            self.sets[j] = row_sets[j]
+        used = set(self.sets)
+        unused = (s for s in range(self.columns) if s not in used)
+        for j in range(self.columns):
+            if self.sets[j] == -1:
+                self.sets[j] = next(unused)
+        return left, down
+
+
+class Eller(MazeGenerator):
+    """
+    Maze generator that takes down the walls of a row of cells in every step
+    with Eller's algorithm (see EllerRows), it doesn't need the grid graph
+    """
+
+    def __init__(self, xnode_count: int, ynode_count: int, rng: Random | None = None):
+        self.rng = rng if rng is not None else Random()
+        self.cell_dims = (ynode_count - 1, xnode_count - 1)  # (rows, columns)
+        self.xnode_count = xnode_count
+        self.ynode_count = ynode_count
+        self.selected_walls = MazeWalls(*self.cell_dims)
+        self.restart()
+
+    def new_wall(self):
+        if self.eller.finished():
+            return
+
+        n = self.eller.row * self.xnode_count
+        left, down = self.eller.next_row()
+        for j in left:
+            self.remove_wall((n + j, n + j + self.xnode_count))
+        for j in down:
+            m = n + self.xnode_count + j
+            self.remove_wall((m, m + 1))
+
+    def finished(self) -> bool:
+        return self.eller.finished()
+
+    def restart(self):
+        self.eller = EllerRows(*self.cell_dims, self.rng)
+        self.selected_walls.fill()
+        self.removed_walls = []
+        node_count = self.xnode_count * self.ynode_count
+        self.remove_wall((0, 1))
+        self.remove_wall((node_count - 2, node_count - 1))
+
+
+class LoadedMaze(MazeGenerator):
+    """
+    Finished maze whose walls were read from somewhere else (see maze_file), so
+    there is nothing to generate. algorithm is the one that generated it.
+    """
+
+    def __init__(self, walls: MazeWalls, algorithm: Algorithms):
+        self.selected_walls = walls
+        self.algorithm = algorithm
+        self.removed_walls = []
+
+    def finished(self) -> bool:
+        return True
+
+    def new_wall(self):
+        return
+
+    def generate_all(self):
+        return
+
     def draw(
         self,
         surface: pygame.Surface,
@@ -324,34 +849,22 @@ class PrimMaze(Generator):
         rect: pygame.Rect,
         color: pygame.Color,
     ):
-        for i in self.selected_walls:
-            from_node = (
-                i[0] % xnode_count * cell_size + rect.x,
-                i[0] // xnode_count * cell_size + rect.y,
-            )
-            to_node = (
-                i[1] % xnode_count * cell_size + rect.x,
-                i[1] // xnode_count * cell_size + rect.y,
-            )
-            pygame.draw.line(surface, color, from_node, to_node)
+        self.selected_walls.draw(surface, cell_size, rect, color)
 
-    def restart(self):
-        self.walls = self.cell_walls((0, 0))
-        self.visited_cells = set([(0, 0)])
-        self.selected_walls = self.grid_walls.copy()
-        self.selected_walls.remove((0, 1))
-        self.selected_walls.remove((len(self.grid) - 2, len(self.grid) - 1))
+    def draw_changes(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+        background: pygame.Color = pygame.Color(0, 0, 0),
+    ) -> list[pygame.Rect]:
+        return []
 
-    def theres_wall(self, cell1: tuple[int, int], cell2: tuple[int, int]) -> bool:
-        if cell1[1] == cell2[1]:
-            bottom = max(cell1[0], cell2[0])
-            n1 = bottom * self.xnode_count + cell1[1]
-            wall = n1, n1 + 1
-            return wall in self.selected_walls
-        else:
-            right = max(cell1[1], cell2[1])
-            wall = (
-                cell1[0] * self.xnode_count + right,
-                (cell1[0] + 1) * self.xnode_count + right,
-            )
-            return wall in self.selected_walls
+    def undrawn(self) -> int:
+        return 0
+
+    # the walls never change, a loaded maze is the same after restarting it
+    def restart(self):
+        return
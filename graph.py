@@ -0,0 +1,148 @@
+from functools import cached_property
+
+import numpy as np
+
+
+def radix_sort_order(weights: np.ndarray) -> np.ndarray:
+    """
+    returns the stable order that sorts the non negative integer weights, it
+    does one LSD pass per 16 bits of the biggest weight because numpy sorts
+    integers of 16 bits or less with a counting (radix) sort
+    """
+    order = np.arange(len(weights))
+    biggest = int(weights.max()) if len(weights) else 0
+    shift = 0
+    while True:
+        digits = ((weights[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digits, kind="stable")]
+        shift += 16
+        if not biggest >> shift:
+            return order
+
+
+class DisjointSet:
+    """
+    Union-find stored in flat arrays, with union by rank and path compression
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    # returns False if x and y were already in the same set
+    def union(self, x: int, y: int) -> bool:
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+
+        if self.rank[x] < self.rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        if self.rank[x] == self.rank[y]:
+            self.rank[x] += 1
+        return True
+
+
+class GridGraph:
+    """
+    Sparse representation of a grid graph, nodes are numbered row by row
+    (node = i * xnode_count + j) and only the existing edges are stored:
+        horizontal[i * (xnode_count - 1) + j]: weight of (i, j) - (i, j + 1),
+        vertical[i * xnode_count + j]: weight of (i, j) - (i + 1, j),
+    """
+
+    def __init__(
+        self,
+        xnode_count: int,
+        ynode_count: int,
+        horizontal: np.ndarray,
+        vertical: np.ndarray,
+    ):
+        assert len(horizontal) == ynode_count * (xnode_count - 1)
+        assert len(vertical) == (ynode_count - 1) * xnode_count
+
+        self.xnode_count = xnode_count
+        self.ynode_count = ynode_count
+        self.horizontal = horizontal
+        self.vertical = vertical
+
+    def __len__(self) -> int:
+        return self.xnode_count * self.ynode_count
+
+    def neighbours(self, node: int) -> list[tuple[int, int]]:
+        """
+        returns the (neighbour, weight) pairs of node
+        """
+        i, j = divmod(node, self.xnode_count)
+        neighbours = []
+        if i > 0:
+            up = node - self.xnode_count
+            neighbours.append((up, int(self.vertical[up])))
+        if j > 0:
+            neighbours.append((node - 1, int(self.horizontal[node - i - 1])))
+        if i < self.ynode_count - 1:
+            neighbours.append((node + self.xnode_count, int(self.vertical[node])))
+        if j < self.xnode_count - 1:
+            neighbours.append((node + 1, int(self.horizontal[node - i])))
+        return neighbours
+
+    def weight(self, u: int, v: int) -> int:
+        """
+        returns the weight of the edge u - v or 0 if they are not adjacent
+        """
+        u, v = min(u, v), max(u, v)
+        if v - u == 1 and v % self.xnode_count:
+            return int(self.horizontal[u - u // self.xnode_count])
+        if v - u == self.xnode_count:
+            return int(self.vertical[u])
+        return 0
+
+    # built the first time it is needed and shared by every generator
+    @cached_property
+    def edge_index(self) -> "EdgeIndex":
+        return EdgeIndex(self)
+
+
+class EdgeIndex:
+    """
+    Flat arrays with every edge of a GridGraph sorted by weight:
+        u[k], v[k], w[k]: endpoints (u < v) and weight of the k-th cheapest edge,
+        ids[k]: id of the k-th cheapest edge,
+    horizontal edges have ids [0, horizontal_count) in the same order as
+    GridGraph.horizontal and vertical edges go after them.
+    """
+
+    def __init__(self, graph: GridGraph):
+        self.horizontal_count = len(graph.horizontal)
+
+        nodes = np.arange(len(graph), dtype=np.int64).reshape(
+            graph.ynode_count, graph.xnode_count
+        )
+        horizontal = nodes[:, :-1].ravel()
+        vertical = nodes[:-1, :].ravel()
+        u = np.concatenate((horizontal, vertical))
+        v = np.concatenate((horizontal + 1, vertical + graph.xnode_count))
+        w = np.concatenate((graph.horizontal, graph.vertical))
+
+        self.ids = radix_sort_order(w)
+        self.u = u[self.ids]
+        self.v = v[self.ids]
+        self.w = w[self.ids]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, k: int) -> tuple[int, int, int]:
+        return int(self.u[k]), int(self.v[k]), int(self.w[k])
+
+    def __iter__(self):
+        return zip(self.u.tolist(), self.v.tolist(), self.w.tolist())
@@ -0,0 +1,96 @@
+import numpy as np
+
+# number of open directions of every mask of MazeWalls.open_directions
+DEGREES = np.array([bin(mask).count("1") for mask in range(16)], dtype=np.uint8)
+
+
+class JunctionGraph:
+    """
+    Finished maze reduced to its junctions and dead ends (the nodes, cells with
+    a number of open directions other than 2) joined by the corridors between them:
+        corridors[k]: cell ids of the k-th corridor, from one node to the other,
+        adjacency[node]: list of (neighbour, k) with the corridors leaving node,
+        corridor_of[c]: corridor that goes through the cell c, -1 for the nodes,
+        offset_of[c]: position of the cell c in its corridor,
+    """
+
+    def __init__(
+        self,
+        open_directions: bytearray,
+        direction_offsets: list[tuple[int, ...]],
+    ):
+        self.open_directions = open_directions
+        self.direction_offsets = direction_offsets
+        cell_count = len(open_directions)
+
+        degrees = DEGREES[np.frombuffer(open_directions, dtype=np.uint8)]
+        self.is_node = bytearray((degrees != 2).astype(np.uint8).tobytes())
+        self.corridor_of = np.full(cell_count, -1, dtype=np.int64)
+        self.offset_of = np.zeros(cell_count, dtype=np.int64)
+        self.corridors: list[list[int]] = []
+        self.adjacency: dict[int, list[tuple[int, int]]] = {
+            node: [] for node in np.flatnonzero(degrees != 2).tolist()
+        }
+
+        for node in list(self.adjacency):
+            for cell in self.neighbours(node):
+                self.walk(node, cell)
+
+        # loops of corridors without any node, one of their cells becomes a node
+        for cell in np.flatnonzero((self.corridor_of == -1) & (degrees == 2)).tolist():
+            if self.corridor_of[cell] == -1 and not self.is_node[cell]:
+                self.is_node[cell] = 1
+                self.adjacency[cell] = []
+                self.walk(cell, self.neighbours(cell)[0])
+
+    def neighbours(self, cell: int) -> list[int]:
+        return [
+            cell + offset
+            for offset in self.direction_offsets[self.open_directions[cell]]
+        ]
+
+    # follows the corridor that goes from node through cell until another node
+    def walk(self, node: int, cell: int):
+        if not self.is_node[cell] and self.corridor_of[cell] != -1:
+            return
+        # two adjacent nodes, the corridor is added from the smallest one
+        if self.is_node[cell] and cell < node:
+            return
+
+        corridor = [node]
+        previous = node
+        while not self.is_node[cell]:
+            corridor.append(cell)
+            a, b = self.neighbours(cell)
+            previous, cell = cell, a if b == previous else b
+        corridor.append(cell)
+
+        k = len(self.corridors)
+        self.corridors.append(corridor)
+        inside = np.array(corridor[1:-1], dtype=np.int64)
+        self.corridor_of[inside] = k
+        self.offset_of[inside] = np.arange(1, len(corridor) - 1)
+        self.adjacency[node].append((cell, k))
+        self.adjacency[cell].append((node, k))
+
+    # returns the (node, k, offset of cell, offset of node) entries to reach the
+    # nodes next to cell through its corridor k
+    def exits(self, cell: int) -> list[tuple[int, int, int, int]]:
+        k = int(self.corridor_of[cell])
+        corridor = self.corridors[k]
+        offset = int(self.offset_of[cell])
+        return [
+            (corridor[0], k, offset, 0),
+            (corridor[-1], k, offset, len(corridor) - 1),
+        ]
+
+    # returns the offset of node in the corridor k
+    def node_offset(self, node: int, k: int) -> int:
+        return 0 if self.corridors[k][0] == node else len(self.corridors[k]) - 1
+
+    # cells of the corridor k from the offset start to the offset end, both included
+    def segment(self, k: int, start: int, end: int) -> list[int]:
+        corridor = self.corridors[k]
+        if start <= end:
+            return corridor[start : end + 1]
+        return corridor[end : start + 1][::-1]
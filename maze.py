@@ -1,34 +1,42 @@
-from random import randint
+from functools import cached_property
+from random import Random
 
+import numpy as np
 import pygame
 
-from generators import Boruvka, Generator, Kruskal, Prim, PrimMaze
+import pixel_renderer
+from distance_field import DistanceField
+from generators import (
+    Boruvka,
+    Eller,
+    Generator,
+    Kruskal,
+    LoadedMaze,
+    MazeGenerator,
+    Prim,
+    PrimMaze,
+)
+from graph import GridGraph
+from junctions import JunctionGraph
+from tree_index import TreeIndex
 from utils import Algorithms, PathFinder
+from walls import DOWN, LEFT, RIGHT, UP
+
+# distance fields kept per maze, the least recently used is dropped first
+DISTANCE_FIELDS = 16
 
 
 def generate_grid_graph(
-    xnode_count: int, ynode_count: int, max_cost: int
-) -> list[list[int]]:
-    graph = [
-        [0 for _ in range(xnode_count * ynode_count)]
-        for _ in range(xnode_count * ynode_count)
-    ]
-    for i in range(ynode_count):
-        for j in range(xnode_count):
-            node = i * xnode_count + j
-            if i > 0:
-                graph[node][node - xnode_count] = randint(1, max_cost)
-                graph[node - xnode_count][node] = graph[node][node - xnode_count]
-            if j > 0:
-                graph[node][node - 1] = randint(1, max_cost)
-                graph[node - 1][node] = graph[node][node - 1]
-            if i < ynode_count - 1:
-                graph[node][node + xnode_count] = randint(1, max_cost)
-                graph[node + xnode_count][node] = graph[node][node + xnode_count]
-            if j < xnode_count - 1:
-                graph[node][node + 1] = randint(1, max_cost)
-                graph[node + 1][node] = graph[node][node + 1]
-    return graph
+    xnode_count: int, ynode_count: int, max_cost: int, seed: int | None = None
+) -> GridGraph:
+    rng = np.random.default_rng(seed)
+    horizontal = rng.integers(
+        1, max_cost, ynode_count * (xnode_count - 1), dtype=np.int32, endpoint=True
+    )
+    vertical = rng.integers(
+        1, max_cost, (ynode_count - 1) * xnode_count, dtype=np.int32, endpoint=True
+    )
+    return GridGraph(xnode_count, ynode_count, horizontal, vertical)
 
 
 class Maze:
@@ -38,34 +46,74 @@ class Maze:
         cell_size: int,
         max_cost: int = 10,
         color: pygame.Color = pygame.Color(255, 255, 255),
+        seed: int | None = None,
+        loaded: LoadedMaze | None = None,
+        algorithm: Algorithms = Algorithms.PRIM,
     ):
+        # the seed is always known so any maze can be generated again
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
         self.cell_size = cell_size
         self.xnode_count = rect.width // cell_size + 1
         self.ynode_count = rect.height // cell_size + 1
         self.max_cost = max_cost
-        self.grid_graph = generate_grid_graph(
-            self.xnode_count, self.ynode_count, max_cost
-        )
         self.rect = rect
         self.color = color
+        self.background = pygame.Color(0, 0, 0)
+        # the maze is drawn in this surface and only the changes of every frame
+        # are added to it, it is created the first time the maze is drawn
+        self.surface: pygame.Surface | None = None
+        self.redraw = True
 
-        self.prim: Prim | None = Prim(self.grid_graph)
+        self.prim: Prim | None = None
         self.boruvka: Boruvka | None = None
         self.kruskal: Kruskal | None = None
         self.prim_maze: PrimMaze | None = None
-        self.curr_alg: Generator = self.prim
-        self.generation_mode = Algorithms.PRIM
+        self.eller: Eller | None = None
+        # it starts generating with algorithm unless it is given a finished maze,
+        # whose cells must fit in rect
+        self.curr_alg: Generator
+        if loaded is not None:
+            assert loaded.selected_walls.rows == self.ynode_count - 1
+            assert loaded.selected_walls.columns == self.xnode_count - 1
+            self.curr_alg = loaded
+            self.generation_mode = loaded.algorithm
+
+        # open directions of every cell, built once the maze is finished
+        self.open_directions: bytearray | None = None
+        self.junctions: JunctionGraph | None = None
+        self.tree: TreeIndex | None = None
+        self.distance_fields: dict[int, DistanceField] = {}
+        # cell id offsets of the moves allowed by every mask of open_directions
+        columns = self.xnode_count - 1
+        moves = [(DOWN, columns), (UP, -columns), (RIGHT, 1), (LEFT, -1)]
+        self.direction_offsets = [
+            tuple(offset for direction, offset in moves if mask & direction)
+            for mask in range(16)
+        ]
 
         self.start = (0, 0)
         self.target = (self.ynode_count - 2, self.xnode_count - 2)
         self.path_finder: PathFinder | None = None
+        # the generator is built by set_generation_mode, so only the structures
+        # that algorithm needs are created (eller doesn't use the grid graph)
+        if loaded is None:
+            self.set_generation_mode(algorithm)
+
+    # built the first time a generator needs it, a loaded maze never does
+    @cached_property
+    def grid_graph(self) -> GridGraph:
+        return generate_grid_graph(
+            self.xnode_count, self.ynode_count, self.max_cost, self.seed
+        )
 
     def set_generation_mode(self, alg: Algorithms):
         self.generation_mode = alg
+        self.redraw = True
+        self.clear_caches()
         match alg:
             case Algorithms.PRIM:
                 if self.prim is None:
-                    self.prim = Prim(self.grid_graph)
+                    self.prim = Prim(self.grid_graph, Random(self.seed))
                 self.curr_alg = self.prim
             case Algorithms.KRUSKAL:
                 if self.kruskal is None:
@@ -78,34 +126,111 @@ class Maze:
             case Algorithms.PRIM_MAZE:
                 if self.prim_maze is None:
                     self.prim_maze = PrimMaze(
-                        self.grid_graph, self.xnode_count, self.ynode_count
+                        self.grid_graph,
+                        self.xnode_count,
+                        self.ynode_count,
+                        Random(self.seed),
                     )
                 self.curr_alg = self.prim_maze
+            case Algorithms.ELLER:
+                if self.eller is None:
+                    self.eller = Eller(
+                        self.xnode_count, self.ynode_count, Random(self.seed)
+                    )
+                self.curr_alg = self.eller
+        # a solver kept from the previous maze must not use its structures
+        if self.path_finder is not None:
+            self.path_finder.restart()
 
     def new_wall(self):
         self.curr_alg.new_wall()
 
+    # finishes the current generation at once, without animation
+    def generate_all(self):
+        self.curr_alg.generate_all()
+        # maze generators forget the walls taken down meanwhile, so it is redrawn
+        self.redraw = True
+
     def is_fully_created(self) -> bool:
         return self.curr_alg.finished()
 
-    def draw_maze(self, surface: pygame.Surface):
-        self.curr_alg.draw(
-            surface, self.xnode_count, self.cell_size, self.rect, self.color
-        )
+    # only finished mazes can be solved, MSTs can't
+    def is_solvable(self) -> bool:
+        return isinstance(self.curr_alg, MazeGenerator) and self.curr_alg.finished()
 
-    def draw_grid(self, surface: pygame.Surface):
-        for i, node in enumerate(self.grid_graph):
-            for j, edge in enumerate(node):
-                from_node = (
-                    i % self.xnode_count * self.cell_size + self.rect.x,
-                    i // self.xnode_count * self.cell_size + self.rect.y,
+    # brings the retained surface up to date and returns the changed rects
+    def update_surface(self) -> list[pygame.Rect]:
+        local_rect = pygame.Rect(0, 0, self.rect.width, self.rect.height)
+        if self.surface is None:
+            self.surface = pygame.Surface((self.rect.width + 1, self.rect.height + 1))
+            self.surface.set_colorkey(self.background)
+            self.redraw = True
+
+        # with small cells the pixels are written directly
+        if self.cell_size < pixel_renderer.PIXEL_CELL_SIZE:
+            if self.redraw:
+                self.redraw = False
+                self.surface.fill(self.background)
+                self.curr_alg.draw_pixels(
+                    self.surface, self.cell_size, local_rect, self.color
                 )
-                to_node = (
-                    j % self.xnode_count * self.cell_size + self.rect.x,
-                    j // self.xnode_count * self.cell_size + self.rect.y,
+            elif self.curr_alg.undrawn():
+                self.curr_alg.draw_pixel_changes(
+                    self.surface,
+                    self.cell_size,
+                    local_rect,
+                    self.color,
+                    self.background,
                 )
-                if edge:
-                    pygame.draw.line(surface, self.color, from_node, to_node)
+            else:
+                return []
+            return [self.surface.get_rect(topleft=self.rect.topleft)]
+
+        if self.redraw:
+            self.redraw = False
+            self.surface.fill(self.background)
+            self.curr_alg.draw(
+                self.surface, self.xnode_count, self.cell_size, local_rect, self.color
+            )
+            return [self.surface.get_rect(topleft=self.rect.topleft)]
+
+        dirty = self.curr_alg.draw_changes(
+            self.surface,
+            self.xnode_count,
+            self.cell_size,
+            local_rect,
+            self.color,
+            self.background,
+        )
+        return [r.move(self.rect.topleft) for r in dirty]
+
+    # blits the maze over surface, only the parts that changed since the last call
+    # if full is False, and returns the rects of surface that changed
+    def draw_maze(
+        self, surface: pygame.Surface, full: bool = True
+    ) -> list[pygame.Rect]:
+        dirty = self.update_surface()
+        assert self.surface is not None
+
+        if full:
+            surface.blit(self.surface, self.rect.topleft)
+        else:
+            for r in dirty:
+                surface.fill(self.background, r)
+                surface.blit(self.surface, r, r.move(-self.rect.x, -self.rect.y))
+        return dirty
+
+    def draw_grid(self, surface: pygame.Surface):
+        for i, j, _ in self.grid_graph.edge_index:
+            from_node = (
+                i % self.xnode_count * self.cell_size + self.rect.x,
+                i // self.xnode_count * self.cell_size + self.rect.y,
+            )
+            to_node = (
+                j % self.xnode_count * self.cell_size + self.rect.x,
+                j // self.xnode_count * self.cell_size + self.rect.y,
+            )
+            pygame.draw.line(surface, self.color, from_node, to_node)
 
     def draw_grid_points(self, surface: pygame.Surface):
         for i in range(self.ynode_count):
@@ -122,36 +247,100 @@ class Maze:
 
     def restart(self):
         self.curr_alg.restart()
+        self.redraw = True
+        self.clear_caches()
         if self.path_finder is not None:
             self.path_finder.restart()
 
     def theres_wall(self, cell1: tuple[int, int], cell2: tuple[int, int]) -> bool:
-        assert isinstance(self.curr_alg, PrimMaze)
+        assert isinstance(self.curr_alg, MazeGenerator)
 
         return self.curr_alg.theres_wall(cell1, cell2)
 
-    def next_cells(self, pos: tuple[int, int]) -> list[tuple[int, int]]:
-        moves = []
+    # the structures built from a finished maze are dropped when the maze changes
+    def clear_caches(self):
+        self.open_directions = None
+        self.junctions = None
+        self.tree = None
+        self.distance_fields = {}
+
+    def get_open_directions(self) -> bytearray:
+        if self.open_directions is None:
+            assert isinstance(self.curr_alg, MazeGenerator) and self.is_fully_created()
+            self.open_directions = self.curr_alg.selected_walls.open_directions()
+        return self.open_directions
+
+    def junction_graph(self) -> JunctionGraph:
+        if self.junctions is None:
+            self.junctions = JunctionGraph(
+                self.get_open_directions(), self.direction_offsets
+            )
+        return self.junctions
+
+    # answers path and distance queries between any two cells of the maze
+    def tree_index(self) -> TreeIndex:
+        if self.tree is None:
+            self.tree = TreeIndex(self.get_open_directions(), self.direction_offsets)
+        return self.tree
+
+    # distances from source (the start by default) to every cell of the maze
+    def distance_field(self, source: tuple[int, int] | None = None) -> DistanceField:
+        source_id = self.cell_id(source if source is not None else self.start)
+        field = self.distance_fields.pop(source_id, None)
+        if field is None:
+            field = DistanceField(
+                self.get_open_directions(), self.direction_offsets, source_id
+            )
+            if len(self.distance_fields) >= DISTANCE_FIELDS:
+                del self.distance_fields[next(iter(self.distance_fields))]
+        self.distance_fields[source_id] = field
+        return field
+
+    # colours every cell with its distance from source, the walls go on top
+    def draw_heatmap(
+        self, surface: pygame.Surface, source: tuple[int, int] | None = None
+    ):
+        field = self.distance_field(source)
+        values = field.distance.reshape(self.ynode_count - 1, self.xnode_count - 1)
+        pixel_renderer.draw_heatmap(
+            surface,
+            values / max(field.max_distance, 1),
+            self.cell_size,
+            self.rect,
+            pixel_renderer.heatmap_palette(surface),
+        )
 
-        for move in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            next_pos = pos[0] + move[0], pos[1] + move[1]
-            if next_pos[0] < 0 or next_pos[0] > self.ynode_count - 2:
-                continue
+    # returns the ids of the cells that can be reached from cell_id in one move
+    def open_neighbours(self, cell_id: int) -> list[int]:
+        open_directions = self.open_directions
+        if open_directions is None:
+            open_directions = self.get_open_directions()
 
-            elif next_pos[1] < 0 or next_pos[1] > self.xnode_count - 2:
-                continue
+        return [
+            cell_id + offset
+            for offset in self.direction_offsets[open_directions[cell_id]]
+        ]
 
-            if not self.theres_wall(pos, next_pos):
-                moves.append(next_pos)
+    def next_cells(self, pos: tuple[int, int]) -> list[tuple[int, int]]:
+        return [self.cell_pos(c) for c in self.open_neighbours(self.cell_id(pos))]
+
+    # cells are numbered row by row, cell = i, j coords of the cell
+    def cell_id(self, cell: tuple[int, int]) -> int:
+        return cell[0] * (self.xnode_count - 1) + cell[1]
 
-        return moves
+    def cell_pos(self, cell_id: int) -> tuple[int, int]:
+        return divmod(cell_id, self.xnode_count - 1)
+
+    # returns an array with the i, j coords of every cell id
+    def cell_positions(self, cell_ids) -> np.ndarray:
+        return np.stack(np.divmod(np.asarray(cell_ids), self.xnode_count - 1), axis=1)
 
     def set_path_finder(self, path_finder: PathFinder):
         self.path_finder = path_finder
 
     # Makes a step in the path finder and draws the current state of the algorithm
     def solve_step(self):
-        if self.generation_mode != Algorithms.PRIM_MAZE or not self.is_fully_created():
+        if not self.is_solvable():
             print("[WARNING] trying to solve an MST or a maze that is not finished")
             return
         if self.path_finder is None:
@@ -165,7 +354,12 @@ class Maze:
         if self.path_finder is None:
             return
 
-        self.path_finder.draw(
+        draw = (
+            self.path_finder.draw_pixels
+            if self.cell_size < pixel_renderer.PIXEL_CELL_SIZE
+            else self.path_finder.draw
+        )
+        draw(
             surface,
             self.xnode_count,
             self.cell_size,
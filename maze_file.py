@@ -0,0 +1,187 @@
+"""
+A maze file is a header followed by the bytes of the two bit grids of the walls
+of the maze (see walls.MazeWalls), the horizontal one and then the vertical one,
+with every row starting on a new byte. The header is (little endian):
+    magic (4 bytes), version (u16), algorithm (u8), padding (1 byte),
+    rows (u32), columns (u32), seed (16 bytes, unsigned),
+    start row, start column, target row, target column (u32),
+"""
+
+import mmap
+import struct
+from random import Random
+from typing import NamedTuple
+
+import numpy as np
+import pygame
+
+from generators import EllerRows, LoadedMaze, MazeGenerator
+from maze import Maze
+from utils import Algorithms
+from walls import BitGrid, MazeWalls
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxII16sIIII")
+
+
+class MazeHeader(NamedTuple):
+    algorithm: Algorithms
+    rows: int
+    columns: int
+    seed: int
+    start: tuple[int, int]
+    target: tuple[int, int]
+
+
+def pack_header(header: MazeHeader) -> bytes:
+    return HEADER.pack(
+        MAGIC,
+        VERSION,
+        header.algorithm.value,
+        header.rows,
+        header.columns,
+        header.seed.to_bytes(16, "little"),
+        *header.start,
+        *header.target,
+    )
+
+
+def save_maze(maze: Maze, path: str):
+    assert isinstance(maze.curr_alg, MazeGenerator) and maze.is_solvable()
+    walls = maze.curr_alg.selected_walls
+    header = MazeHeader(
+        maze.generation_mode,
+        walls.rows,
+        walls.columns,
+        maze.seed,
+        maze.start,
+        maze.target,
+    )
+    with open(path, "wb") as f:
+        f.write(pack_header(header))
+        f.write(walls.horizontal.buffer)
+        f.write(walls.vertical.buffer)
+
+
+# bytes of a row of a bit grid with its first length walls standing but the
+# ones in gaps (a list of columns)
+def pack_row(length: int, gaps: list[int]) -> bytes:
+    row = np.ones(length, dtype=bool)
+    row[gaps] = False
+    return np.packbits(row, bitorder="little").tobytes()
+
+
+def stream_eller_maze(path: str, rows: int, columns: int, seed: int) -> MazeHeader:
+    """
+    generates a maze with Eller's algorithm straight into a maze file, every
+    row is written once it is made and only the current one is kept in memory,
+    so the maze can be bigger than the RAM. The file is the same one that
+    save_maze writes for an Eller maze of the same size and seed.
+    """
+    header = MazeHeader(
+        Algorithms.ELLER, rows, columns, seed, (0, 0), (rows - 1, columns - 1)
+    )
+    horizontal_stride = (columns + 7) // 8
+    vertical_stride = (columns + 8) // 8
+    horizontal_start = HEADER.size
+    vertical_start = horizontal_start + (rows + 1) * horizontal_stride
+
+    eller = EllerRows(rows, columns, Random(seed))
+    with open(path, "wb") as f:
+        f.write(pack_header(header))
+        f.truncate(vertical_start + rows * vertical_stride)
+        # the entrance is over the first cell
+        f.write(pack_row(columns, [0]))
+
+        while not eller.finished():
+            i = eller.row
+            left, down = eller.next_row()
+            # the exit is under the last cell
+            if eller.finished():
+                down = [columns - 1]
+
+            f.seek(vertical_start + i * vertical_stride)
+            f.write(pack_row(columns + 1, left))
+            f.seek(horizontal_start + (i + 1) * horizontal_stride)
+            f.write(pack_row(columns, down))
+    return header
+
+
+def read_header(data) -> MazeHeader:
+    if len(data) < HEADER.size:
+        raise ValueError("not a maze file, it is too short")
+    magic, version, algorithm, rows, columns, seed, *cells = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a maze file")
+    if version != VERSION:
+        raise ValueError(f"unsupported maze file version {version}")
+
+    return MazeHeader(
+        Algorithms(algorithm),
+        rows,
+        columns,
+        int.from_bytes(seed, "little"),
+        (cells[0], cells[1]),
+        (cells[2], cells[3]),
+    )
+
+
+def load_walls(path: str) -> tuple[MazeHeader, MazeWalls]:
+    """
+    maps the file in memory and returns its header and walls, the bit grids
+    use the mapped bytes without copying them so only the parts that are read
+    are loaded from the disk (and written pages are only copied in memory)
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    header = read_header(data)
+    horizontal_size = (header.rows + 1) * ((header.columns + 7) // 8)
+    vertical_size = header.rows * ((header.columns + 8) // 8)
+    if len(data) != HEADER.size + horizontal_size + vertical_size:
+        raise ValueError("the size of the maze file doesn't match its header")
+
+    view = memoryview(data)
+    start = HEADER.size
+    horizontal = BitGrid(
+        header.rows + 1, header.columns, view[start : start + horizontal_size]
+    )
+    start += horizontal_size
+    vertical = BitGrid(
+        header.rows, header.columns + 1, view[start : start + vertical_size]
+    )
+    return header, MazeWalls(header.rows, header.columns, horizontal, vertical)
+
+
+def load_maze(
+    path: str,
+    rect: pygame.Rect | None = None,
+    color: pygame.Color = pygame.Color(255, 255, 255),
+) -> Maze:
+    """
+    returns a finished maze with the walls of the file and cells as big as
+    possible to fit in rect, ValueError is raised if it doesn't fit. Without
+    rect the cells are 1 pixel, to solve mazes of any size without drawing them.
+    """
+    header, walls = load_walls(path)
+    if rect is None:
+        rect = pygame.Rect(0, 0, header.columns, header.rows)
+    cell_size = min(rect.width // header.columns, rect.height // header.rows)
+    if cell_size < 1:
+        raise ValueError(
+            f"a maze of {header.rows}x{header.columns} cells doesn't fit in {rect}"
+        )
+
+    maze = Maze(
+        pygame.Rect(
+            rect.x, rect.y, header.columns * cell_size, header.rows * cell_size
+        ),
+        cell_size,
+        color=color,
+        seed=header.seed,
+        loaded=LoadedMaze(walls, header.algorithm),
+    )
+    maze.start = header.start
+    maze.target = header.target
+    return maze
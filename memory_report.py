@@ -0,0 +1,186 @@
+#!/bin/python3
+
+import argparse
+import math
+import tracemalloc
+from typing import Callable
+
+import pygame
+
+from benchmark import SOLVERS
+from maze import Maze
+from utils import Algorithms
+
+
+def stage(entries: list[tuple[str, int, int]], name: str, build: Callable[[], object]):
+    """
+    runs build and appends (name, bytes still allocated when it returns, peak
+    bytes allocated while it ran) to entries, the result is returned so what is
+    retained is alive during the measure
+    """
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    entries.append((name, current - before, peak - before))
+    return result
+
+
+def memory_report(
+    alg: Algorithms, rows: int, columns: int, max_cost: int = 10, seed: int = 0
+) -> list[tuple[str, int, int]]:
+    """
+    returns the (structure, retained bytes, peak bytes) of every structure that
+    a rows x columns maze holds after alg finishes (and after it is solved for
+    the maze generators), measured with tracemalloc in the order they are built
+    """
+    # the maze is built before tracing starts with eller, which doesn't build
+    # the grid graph, and its generator is dropped to be built again while traced
+    maze = Maze(
+        pygame.Rect(0, 0, columns, rows),
+        1,
+        max_cost,
+        seed=seed,
+        algorithm=Algorithms.ELLER,
+    )
+    maze.eller = None
+    entries: list[tuple[str, int, int]] = []
+
+    tracemalloc.start()
+    try:
+        # eller makes the maze without the grid graph
+        if alg != Algorithms.ELLER:
+            stage(entries, "grid graph", lambda: maze.grid_graph)
+        if alg in (Algorithms.KRUSKAL, Algorithms.BORUVKA):
+            stage(entries, "edge index", lambda: maze.grid_graph.edge_index)
+
+        def generate():
+            maze.set_generation_mode(alg)
+            maze.generate_all()
+            return maze.curr_alg
+
+        stage(entries, f"{alg.name.lower()} generator", generate)
+        if not maze.is_solvable():
+            return entries
+
+        stage(entries, "open directions", maze.get_open_directions)
+        stage(entries, "junction graph", maze.junction_graph)
+        stage(entries, "tree index", maze.tree_index)
+        stage(entries, "distance field", maze.distance_field)
+
+        # the solvers are kept alive like the maze keeps its caches
+        solvers = []
+        for name, solver in SOLVERS.items():
+
+            def solve(solver=solver):
+                path_finder = solver(maze)
+                while not path_finder.has_finished():
+                    path_finder.next_step()
+                return path_finder
+
+            solvers.append(stage(entries, f"{name} solver", solve))
+        return entries
+    finally:
+        tracemalloc.stop()
+
+
+# returns the bytes held once everything is built and the peak while building
+def totals(entries: list[tuple[str, int, int]]) -> tuple[int, int]:
+    retained = 0
+    peak = 0
+    for _, current, stage_peak in entries:
+        peak = max(peak, retained + stage_peak)
+        retained += current
+    return retained, peak
+
+
+def largest_grid(
+    alg: Algorithms,
+    rows: int,
+    columns: int,
+    peak: int,
+    budget: int,
+    max_cost: int,
+    seed: int,
+) -> tuple[int, int]:
+    """
+    returns the rows and columns of the largest grid with the shape of rows x
+    columns whose peak fits in budget bytes, given the peak of rows x columns.
+    The memory is taken as linear in the cells and fitted from that peak and
+    the one of a grid with half the sides.
+    """
+    small_rows, small_columns = max(rows // 2, 1), max(columns // 2, 1)
+    _, small_peak = totals(
+        memory_report(alg, small_rows, small_columns, max_cost, seed)
+    )
+
+    small_cells, cells = small_rows * small_columns, rows * columns
+    per_cell = (peak - small_peak) / max(cells - small_cells, 1)
+    fixed = peak - per_cell * cells
+    if per_cell <= 0:
+        return rows, columns
+
+    scale = math.sqrt(max(budget - fixed, 0) / per_cell / cells)
+    return int(rows * scale), int(columns * scale)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="reports the memory of every structure of a maze with tracemalloc"
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        choices=[alg.name.lower() for alg in Algorithms],
+        default=Algorithms.PRIM_MAZE.name.lower(),
+    )
+    parser.add_argument("-r", "--rows", type=int, default=200)
+    parser.add_argument("-c", "--columns", type=int, default=200)
+    parser.add_argument("--max-cost", type=int, default=10)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument(
+        "-b",
+        "--budget",
+        type=float,
+        help="MiB of RAM, prints the largest grid whose peak fits in them",
+    )
+    args = parser.parse_args()
+
+    alg = Algorithms[args.algorithm.upper()]
+    entries = memory_report(alg, args.rows, args.columns, args.max_cost, args.seed)
+    cells = args.rows * args.columns
+
+    print(f"{args.algorithm} {args.rows}x{args.columns} ({cells} cells)")
+    print(f"{'structure':<20} {'retained':>12} {'per cell':>10} {'peak':>12}")
+    for name, current, peak in entries:
+        print(
+            f"{name:<20} {format_bytes(current):>12} {current / cells:>8.1f} B "
+            f"{format_bytes(peak):>12}"
+        )
+    retained, peak = totals(entries)
+    print(
+        f"{'total':<20} {format_bytes(retained):>12} {retained / cells:>8.1f} B "
+        f"{format_bytes(peak):>12}"
+    )
+
+    if args.budget is not None:
+        budget = int(args.budget * 2**20)
+        rows, columns = largest_grid(
+            alg, args.rows, args.columns, peak, budget, args.max_cost, args.seed
+        )
+        print(
+            f"largest grid in {format_bytes(budget)}: {rows}x{columns} "
+            f"({rows * columns} cells)"
+        )
+
+
+if __name__ == "__main__":
+    main()
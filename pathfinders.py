@@ -1,47 +1,100 @@
 import heapq
+from array import array
 from collections import deque
 from math import sqrt
 from typing import Callable
 
 import pygame
 
+import pixel_renderer
+from junctions import JunctionGraph
 from maze import Maze
 from utils import PathFinder
 
 
+# follows the parent pointers from cell back to the start of the search
+def build_path(maze: Maze, parent: array, cell: int) -> list[tuple[int, int]]:
+    path = [maze.cell_pos(cell)]
+    while parent[cell] != cell:
+        cell = parent[cell]
+        path.append(maze.cell_pos(cell))
+    path.reverse()
+    return path
+
+
+def draw_cells(
+    surface: pygame.Surface,
+    cells: list[tuple[int, int]],
+    cell_size: int,
+    rect: pygame.Rect,
+    color: pygame.Color,
+):
+    for c in cells:
+        cell_pos = c[1] * cell_size + rect.x, c[0] * cell_size + rect.y
+        pygame.draw.rect(
+            surface,
+            color,
+            (cell_pos[0], cell_pos[1], cell_size, cell_size),
+        )
+
+
+class SearchState:
+    """
+    Search buffers indexed by cell id:
+        parent[c]: cell from which c was reached, -1 if not reached yet,
+        visited[c]: 1 if c has been reached,
+        visited_cells: reached cells in the order they were reached,
+    """
+
+    def __init__(self, maze: Maze, start: int):
+        cell_count = (maze.xnode_count - 1) * (maze.ynode_count - 1)
+        self.parent = array("q", [-1]) * cell_count
+        self.visited = bytearray(cell_count)
+        self.visited_cells = [start]
+        self.parent[start] = start
+        self.visited[start] = 1
+
+    def reach(self, cell: int, parent: int):
+        self.parent[cell] = parent
+        self.visited[cell] = 1
+        self.visited_cells.append(cell)
+
+
 class Bfs(PathFinder):
     def __init__(self, maze: Maze):
         self.maze = maze
         self.start = maze.start
         self.target = maze.target
-        self.queue = deque([(maze.start, [maze.start])])
-        self.visited = set([maze.start])
-        self.path = [self.start]
-        self.finished = False
+        self.restart()
 
     def next_step(self):
         if not self.queue:
             self.finished = True
+            self.path = build_path(self.maze, self.state.parent, self.current)
             return
 
-        pos, self.path = self.queue.pop()
+        self.current = self.queue.pop()
 
-        if pos == self.target:
+        if self.current == self.target_id:
             self.finished = True
+            self.path = build_path(self.maze, self.state.parent, self.current)
             return
 
-        for cell in self.maze.next_cells(pos):
-            if cell not in self.visited:
-                self.queue.appendleft((cell, self.path + [cell]))
-                self.visited.add(cell)
+        for cell in self.maze.open_neighbours(self.current):
+            if not self.state.visited[cell]:
+                self.queue.appendleft(cell)
+                self.state.reach(cell, self.current)
 
     def has_finished(self):
         return self.finished
 
     def restart(self):
-        self.queue = deque([(self.start, [self.start])])
-        self.visited = set([self.start])
-        self.path = []
+        self.start_id = self.maze.cell_id(self.start)
+        self.target_id = self.maze.cell_id(self.target)
+        self.state = SearchState(self.maze, self.start_id)
+        self.queue = deque([self.start_id])
+        self.current = self.start_id
+        self.path = [self.start]
         self.finished = False
 
     def draw(
@@ -54,23 +107,25 @@ class Bfs(PathFinder):
         path_color: pygame.Color,
     ):
         if self.finished:
-            for c in self.path:
-                cell_pos = c[1] * cell_size + rect.x, c[0] * cell_size + rect.y
-                pygame.draw.rect(
-                    surface,
-                    path_color,
-                    (cell_pos[0], cell_pos[1], cell_size, cell_size),
-                )
-        else:
-            if len(self.visited) == 1:
-                return
-            for c in self.visited:
-                cell_pos = c[1] * cell_size + rect.x, c[0] * cell_size + rect.y
-                pygame.draw.rect(
-                    surface,
-                    visited_color,
-                    (cell_pos[0], cell_pos[1], cell_size, cell_size),
-                )
+            draw_cells(surface, self.path, cell_size, rect, path_color)
+        elif len(self.state.visited_cells) > 1:
+            visited = [self.maze.cell_pos(c) for c in self.state.visited_cells]
+            draw_cells(surface, visited, cell_size, rect, visited_color)
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            pixel_renderer.draw_cells(surface, self.path, cell_size, rect, path_color)
+        elif len(self.state.visited_cells) > 1:
+            visited = self.maze.cell_positions(self.state.visited_cells)
+            pixel_renderer.draw_cells(surface, visited, cell_size, rect, visited_color)
 
 
 class Dfs(PathFinder):
@@ -78,36 +133,40 @@ class Dfs(PathFinder):
         self.maze = maze
         self.start = maze.start
         self.target = maze.target
-        self.queue = deque([(maze.start, [maze.start])])
-        self.visited = set([maze.start])
-        self.path = [self.start]
-        self.finished = False
+        self.restart()
 
     def next_step(self):
         if not self.queue:
             self.finished = True
             return
 
-        pos, self.path = self.queue.pop()
+        self.current = self.queue.pop()
 
-        if pos == self.target:
+        if self.current == self.target_id:
             self.finished = True
             return
 
-        for cell in self.maze.next_cells(pos):
-            if cell not in self.visited:
-                self.queue.append((cell, self.path + [cell]))
-                self.visited.add(cell)
+        for cell in self.maze.open_neighbours(self.current):
+            if not self.state.visited[cell]:
+                self.queue.append(cell)
+                self.state.reach(cell, self.current)
 
     def has_finished(self):
         return self.finished
 
     def restart(self):
-        self.queue = deque([(self.start, [self.start])])
-        self.visited = set([self.start])
-        self.path = []
+        self.start_id = self.maze.cell_id(self.start)
+        self.target_id = self.maze.cell_id(self.target)
+        self.state = SearchState(self.maze, self.start_id)
+        self.queue = [self.start_id]
+        self.current = self.start_id
         self.finished = False
 
+    # the path to the cell being explored, it is only built when it is needed
+    @property
+    def path(self) -> list[tuple[int, int]]:
+        return build_path(self.maze, self.state.parent, self.current)
+
     def draw(
         self,
         surface: pygame.Surface,
@@ -118,13 +177,19 @@ class Dfs(PathFinder):
         path_color: pygame.Color,
     ):
         color = path_color if self.finished else visited_color
-        for c in self.path:
-            cell_pos = c[1] * cell_size + rect.x, c[0] * cell_size + rect.y
-            pygame.draw.rect(
-                surface,
-                color,
-                (cell_pos[0], cell_pos[1], cell_size, cell_size),
-            )
+        draw_cells(surface, self.path, cell_size, rect, color)
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        color = path_color if self.finished else visited_color
+        pixel_renderer.draw_cells(surface, self.path, cell_size, rect, color)
 
 
 def manhattan_distance(x: tuple[int, int], y: tuple[int, int]) -> int:
@@ -140,47 +205,343 @@ class Astar(PathFinder):
         self.maze = maze
         self.start = maze.start
         self.target = maze.target
-        self.queue = [(heuristic(self.start, self.target), 0, maze.start, [maze.start])]
         self.heuristic = heuristic
-        self.visited = set([maze.start])
+        self.restart()
+
+    def next_step(self):
+        if not self.queue:
+            self.finished = True
+            self.path = build_path(self.maze, self.state.parent, self.current)
+            return
+
+        _, cost, self.current = heapq.heappop(self.queue)
+
+        if self.current == self.target_id:
+            self.finished = True
+            self.path = build_path(self.maze, self.state.parent, self.current)
+            return
+
+        for cell in self.maze.open_neighbours(self.current):
+            if not self.state.visited[cell]:
+                heuristic = self.heuristic(self.maze.cell_pos(cell), self.target)
+                heapq.heappush(self.queue, (cost + heuristic + 1, cost + 1, cell))
+                self.state.reach(cell, self.current)
+
+    def has_finished(self):
+        return self.finished
+
+    def restart(self):
+        self.start_id = self.maze.cell_id(self.start)
+        self.target_id = self.maze.cell_id(self.target)
+        self.state = SearchState(self.maze, self.start_id)
+        self.queue = [(self.heuristic(self.start, self.target), 0, self.start_id)]
+        self.current = self.start_id
         self.path = [self.start]
         self.finished = False
 
+    def draw(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            draw_cells(surface, self.path, cell_size, rect, path_color)
+        elif len(self.state.visited_cells) > 1:
+            visited = [self.maze.cell_pos(c) for c in self.state.visited_cells]
+            draw_cells(surface, visited, cell_size, rect, visited_color)
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            pixel_renderer.draw_cells(surface, self.path, cell_size, rect, path_color)
+        elif len(self.state.visited_cells) > 1:
+            visited = self.maze.cell_positions(self.state.visited_cells)
+            pixel_renderer.draw_cells(surface, visited, cell_size, rect, visited_color)
+
+
+class BidirectionalSearch(PathFinder):
+    """
+    Runs a search from the start and another one from the target, every step
+    expands a cell of the side with the smallest frontier and the search stops
+    when a side reaches a cell already reached by the other one. The mazes are
+    spanning trees, so the path through that cell is the only path.
+    Subclasses decide the order of the frontiers with push and pop.
+    """
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.start = maze.start
+        self.target = maze.target
+        self.restart()
+
+    def push(self, side: int, cell: int, cost: int):
+        raise NotImplementedError
+
+    # returns the next cell of the side frontier and its cost from that side
+    def pop(self, side: int) -> tuple[int, int]:
+        raise NotImplementedError
+
+    def new_frontiers(self):
+        raise NotImplementedError
+
     def next_step(self):
+        if self.finished:
+            return
+
+        if not self.frontiers[0] or not self.frontiers[1]:
+            self.finished = True
+            return
+
+        side = 0 if len(self.frontiers[0]) <= len(self.frontiers[1]) else 1
+        state, other = self.states[side], self.states[1 - side]
+        current, cost = self.pop(side)
+
+        for cell in self.maze.open_neighbours(current):
+            if not state.visited[cell]:
+                state.reach(cell, current)
+                self.push(side, cell, cost + 1)
+                if other.visited[cell]:
+                    self.meet(cell)
+                    return
+
+    def meet(self, cell: int):
+        forward = build_path(self.maze, self.states[0].parent, cell)
+        backward = build_path(self.maze, self.states[1].parent, cell)
+        self.path = forward + backward[-2::-1]
+        self.finished = True
+
+    def has_finished(self):
+        return self.finished
+
+    def restart(self):
+        self.start_id = self.maze.cell_id(self.start)
+        self.target_id = self.maze.cell_id(self.target)
+        self.states = (
+            SearchState(self.maze, self.start_id),
+            SearchState(self.maze, self.target_id),
+        )
+        self.new_frontiers()
+        self.path = [self.start]
+        self.finished = False
+        if self.start_id == self.target_id:
+            self.meet(self.start_id)
+
+    def visited_cells(self) -> list[int]:
+        return self.states[0].visited_cells + self.states[1].visited_cells
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            draw_cells(surface, self.path, cell_size, rect, path_color)
+        else:
+            visited = [self.maze.cell_pos(c) for c in self.visited_cells()]
+            draw_cells(surface, visited, cell_size, rect, visited_color)
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            pixel_renderer.draw_cells(surface, self.path, cell_size, rect, path_color)
+        else:
+            visited = self.maze.cell_positions(self.visited_cells())
+            pixel_renderer.draw_cells(surface, visited, cell_size, rect, visited_color)
+
+
+class BidirectionalBfs(BidirectionalSearch):
+    def new_frontiers(self):
+        self.frontiers = (
+            deque([(self.start_id, 0)]),
+            deque([(self.target_id, 0)]),
+        )
+
+    def push(self, side: int, cell: int, cost: int):
+        self.frontiers[side].appendleft((cell, cost))
+
+    def pop(self, side: int) -> tuple[int, int]:
+        return self.frontiers[side].pop()
+
+
+class BidirectionalAstar(BidirectionalSearch):
+    def __init__(self, maze: Maze, heuristic: Callable = manhattan_distance):
+        self.heuristic = heuristic
+        super().__init__(maze)
+
+    def new_frontiers(self):
+        self.goals = self.target, self.start
+        self.frontiers = (
+            [(self.heuristic(self.start, self.target), 0, self.start_id)],
+            [(self.heuristic(self.target, self.start), 0, self.target_id)],
+        )
+
+    def push(self, side: int, cell: int, cost: int):
+        heuristic = self.heuristic(self.maze.cell_pos(cell), self.goals[side])
+        heapq.heappush(self.frontiers[side], (cost + heuristic, cost, cell))
+
+    def pop(self, side: int) -> tuple[int, int]:
+        _, cost, cell = heapq.heappop(self.frontiers[side])
+        return cell, cost
+
+
+# ids of the virtual nodes used when the start or the target are in a corridor
+START = -1
+TARGET = -2
+
+
+class JunctionSolver(PathFinder):
+    """
+    Dijkstra over the junction graph of the maze (see junctions.JunctionGraph),
+    every step settles a junction or a dead end and the corridors are only
+    expanded to cells to draw them. A start or a target inside a corridor is
+    joined to the two ends of its corridor.
+    """
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.start = maze.start
+        self.target = maze.target
+        self.restart()
+
+    def push(self, distance: int, node: int, previous: tuple[int, int, int, int]):
+        self.pushed += 1
+        heapq.heappush(self.queue, (distance, self.pushed, node, previous))
+
+    def next_step(self):
+        # the junction graph is fetched on the first step, the maze may not be
+        # finished yet when the solver is restarted
+        if self.graph is None:
+            self.begin()
+            return
+
         if not self.queue:
             self.finished = True
             return
 
-        _, cost, pos, self.path = heapq.heappop(self.queue)
+        distance, _, node, previous = heapq.heappop(self.queue)
+        if node in self.previous:
+            return
 
-        if pos == self.target:
+        self.previous[node] = previous
+        if node == self.goal:
             self.finished = True
+            self.path = self.build_path()
             return
 
-        for cell in self.maze.next_cells(pos):
-            if cell not in self.visited:
-                heapq.heappush(
-                    self.queue,
-                    (
-                        cost + self.heuristic(cell, self.target) + 1,
-                        cost + 1,
-                        cell,
-                        self.path + [cell],
-                    ),
-                )
-                self.visited.add(cell)
+        for neighbour, k in self.graph.adjacency[node]:
+            if neighbour in self.previous:
+                continue
+            length = len(self.graph.corridors[k]) - 1
+            offset = self.graph.node_offset(node, k)
+            self.push(distance + length, neighbour, (node, k, offset, length - offset))
+            self.explored.append(k)
+
+        for k, offset, target_offset in self.target_exits.get(node, []):
+            self.push(
+                distance + abs(target_offset - offset),
+                TARGET,
+                (node, k, offset, target_offset),
+            )
+            self.explored.append(k)
+
+    # joins the corridor segments followed to reach the goal
+    def build_path(self) -> list[tuple[int, int]]:
+        segments = []
+        node = self.goal
+        while node != START and self.previous[node][1] != -1:
+            node, k, start, end = self.previous[node]
+            segments.append(self.graph.segment(k, start, end))
+
+        path = [self.start_id] if not segments else segments[-1]
+        for segment in reversed(segments[:-1]):
+            path = path + segment[1:]
+        return [self.maze.cell_pos(c) for c in path]
 
     def has_finished(self):
         return self.finished
 
     def restart(self):
-        self.queue = [
-            (self.heuristic(self.start, self.target), 0, self.start, [self.start])
-        ]
-        self.visited = set([self.start])
+        self.graph: JunctionGraph | None = None
+        self.start_id = self.maze.cell_id(self.start)
+        self.target_id = self.maze.cell_id(self.target)
+        # previous[node] = (previous node, corridor, offset in it of the previous
+        # node, offset of node) for the settled nodes, corridor is -1 for the start
+        self.previous: dict[int, tuple[int, int, int, int]] = {}
+        self.queue: list[tuple[int, int, int, tuple[int, int, int, int]]] = []
+        self.pushed = 0
+        # corridors reached so far, to draw them
+        self.explored: list[int] = []
         self.path = [self.start]
         self.finished = False
 
+    # pushes the first nodes, the ones reached from the start
+    def begin(self):
+        self.graph = self.maze.junction_graph()
+
+        # the target becomes the node TARGET if it is inside a corridor
+        self.target_exits: dict[int, list[tuple[int, int, int]]] = {}
+        if self.graph.is_node[self.target_id]:
+            self.goal = self.target_id
+        else:
+            self.goal = TARGET
+            for node, k, target_offset, offset in self.graph.exits(self.target_id):
+                self.target_exits.setdefault(node, []).append(
+                    (k, offset, target_offset)
+                )
+
+        if self.graph.is_node[self.start_id]:
+            self.push(0, self.start_id, (START, -1, 0, 0))
+            return
+
+        for node, k, start_offset, offset in self.graph.exits(self.start_id):
+            self.push(
+                abs(offset - start_offset), node, (START, k, start_offset, offset)
+            )
+            self.explored.append(k)
+
+        if (
+            self.graph.corridor_of[self.start_id]
+            == self.graph.corridor_of[self.target_id]
+        ):
+            k = int(self.graph.corridor_of[self.start_id])
+            start_offset = int(self.graph.offset_of[self.start_id])
+            target_offset = int(self.graph.offset_of[self.target_id])
+            self.push(
+                abs(target_offset - start_offset),
+                TARGET,
+                (START, k, start_offset, target_offset),
+            )
+
+    def visited_cells(self) -> list[int]:
+        cells = {self.start_id}
+        if self.graph is None:
+            return list(cells)
+        for k in set(self.explored):
+            cells.update(self.graph.corridors[k])
+        return list(cells)
+
     def draw(
         self,
         surface: pygame.Surface,
@@ -191,20 +552,72 @@ class Astar(PathFinder):
         path_color: pygame.Color,
     ):
         if self.finished:
-            for c in self.path:
-                cell_pos = c[1] * cell_size + rect.x, c[0] * cell_size + rect.y
-                pygame.draw.rect(
-                    surface,
-                    path_color,
-                    (cell_pos[0], cell_pos[1], cell_size, cell_size),
-                )
+            draw_cells(surface, self.path, cell_size, rect, path_color)
         else:
-            if len(self.visited) == 1:
-                return
-            for c in self.visited:
-                cell_pos = c[1] * cell_size + rect.x, c[0] * cell_size + rect.y
-                pygame.draw.rect(
-                    surface,
-                    visited_color,
-                    (cell_pos[0], cell_pos[1], cell_size, cell_size),
-                )
+            visited = [self.maze.cell_pos(c) for c in self.visited_cells()]
+            draw_cells(surface, visited, cell_size, rect, visited_color)
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            pixel_renderer.draw_cells(surface, self.path, cell_size, rect, path_color)
+        else:
+            visited = self.maze.cell_positions(self.visited_cells())
+            pixel_renderer.draw_cells(surface, visited, cell_size, rect, visited_color)
+
+
+class TreeSolver(PathFinder):
+    """
+    Reads the path from the tree index of the maze (see tree_index.TreeIndex),
+    the index is built once per maze so the path is found in a single step
+    """
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.start = maze.start
+        self.target = maze.target
+        self.restart()
+
+    def next_step(self):
+        index = self.maze.tree_index()
+        path = index.path(self.maze.cell_id(self.start), self.maze.cell_id(self.target))
+        self.path = [self.maze.cell_pos(c) for c in path]
+        self.finished = True
+
+    def has_finished(self):
+        return self.finished
+
+    def restart(self):
+        self.path = [self.start]
+        self.finished = False
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            draw_cells(surface, self.path, cell_size, rect, path_color)
+
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        if self.finished:
+            pixel_renderer.draw_cells(surface, self.path, cell_size, rect, path_color)
@@ -0,0 +1,98 @@
+import numpy as np
+import pygame
+
+# below this cell size the maze is drawn writing the pixels directly, with so
+# few pixels per cell a pygame.draw call costs far more than what it draws
+PIXEL_CELL_SIZE = 5
+
+
+def draw_lines(
+    surface: pygame.Surface,
+    horizontal: np.ndarray,
+    vertical: np.ndarray,
+    cell_size: int,
+    rect: pygame.Rect,
+    color: pygame.Color,
+):
+    """
+    draws the unit segments of a grid of nodes that are cell_size pixels apart
+    (the same pixels as pygame.draw.line):
+        horizontal[i, j]: segment from the node (i, j) to (i, j + 1),
+        vertical[i, j]: segment from the node (i, j) to (i + 1, j),
+    """
+    pixels = pygame.surfarray.pixels2d(surface)
+    mapped = surface.map_rgb(color)
+
+    i, j = np.nonzero(horizontal)
+    x, y = j * cell_size + rect.x, i * cell_size + rect.y
+    for k in range(cell_size + 1):
+        pixels[x + k, y] = mapped
+
+    i, j = np.nonzero(vertical)
+    x, y = j * cell_size + rect.x, i * cell_size + rect.y
+    for k in range(cell_size + 1):
+        pixels[x, y + k] = mapped
+
+    del pixels
+
+
+# cells = array with the i, j coords of the cells (i = row, j = column)
+def draw_cells(
+    surface: pygame.Surface,
+    cells: np.ndarray,
+    cell_size: int,
+    rect: pygame.Rect,
+    color: pygame.Color,
+):
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+    pixels = pygame.surfarray.pixels2d(surface)
+    mapped = surface.map_rgb(color)
+
+    x = cells[:, 1] * cell_size + rect.x
+    y = cells[:, 0] * cell_size + rect.y
+    for dx in range(cell_size):
+        for dy in range(cell_size):
+            pixels[x + dx, y + dy] = mapped
+
+    del pixels
+
+
+# colours of the heatmaps, from the smallest value to the biggest one
+HEATMAP_STOPS = [(16, 16, 96), (120, 40, 170), (240, 120, 40), (255, 235, 140)]
+
+
+def heatmap_palette(surface: pygame.Surface, size: int = 256) -> np.ndarray:
+    """
+    returns size mapped colours of the surface going through HEATMAP_STOPS
+    """
+    stops = np.array(HEATMAP_STOPS, dtype=np.float64)
+    at = np.linspace(0, len(stops) - 1, size)
+    channels = [np.interp(at, np.arange(len(stops)), stops[:, c]) for c in range(3)]
+    return np.array(
+        [surface.map_rgb(color) for color in zip(*(c.astype(int) for c in channels))]
+    )
+
+
+def draw_heatmap(
+    surface: pygame.Surface,
+    values: np.ndarray,
+    cell_size: int,
+    rect: pygame.Rect,
+    palette: np.ndarray,
+):
+    """
+    fills every cell with the colour of its value, values is a rows x columns
+    array scaled to [0, 1] and the cells with a negative value are not drawn
+    """
+    rows, columns = values.shape
+    levels = (np.clip(values, 0, 1) * (len(palette) - 1)).astype(np.int64)
+    colors = palette[levels]
+    # one pixel column per x, so the cells are transposed and repeated
+    block = np.repeat(np.repeat(colors.T, cell_size, axis=0), cell_size, axis=1)
+    drawn = np.repeat(np.repeat((values >= 0).T, cell_size, axis=0), cell_size, axis=1)
+
+    pixels = pygame.surfarray.pixels2d(surface)
+    x, y = rect.x, rect.y
+    area = pixels[x : x + columns * cell_size, y : y + rows * cell_size]
+    area[drawn] = block[drawn]
+    del area, pixels
@@ -0,0 +1,109 @@
+import csv
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+# phases of a frame of the visualizer, in the order they run
+PHASES = [
+    "events",
+    "generate",
+    "solve",
+    "widgets",
+    "maze",
+    "solution",
+    "panel",
+    "update",
+    "wait",
+]
+
+
+class FrameProfiler:
+    """
+    Splits the time of every frame into PHASES: mark(phase) adds the time since
+    the previous mark to phase and end_frame(steps) stores the frame as a sample.
+    The last window samples are used for the overlay, all of them are kept to
+    write them to a csv if keep_all is set.
+    """
+
+    def __init__(self, window: int = 120, keep_all: bool = False):
+        self.samples: deque[list[float]] = deque(maxlen=window)
+        self.all_samples: list[list[float]] | None = [] if keep_all else None
+        self.current = [0.0] * (len(PHASES) + 1)
+        self.last = perf_counter()
+        self.frames = 0
+        self.index = {phase: n for n, phase in enumerate(PHASES)}
+        self.overlay: pygame.Surface | None = None
+
+    def mark(self, phase: str):
+        now = perf_counter()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self, steps: int):
+        self.current[-1] = steps
+        self.samples.append(self.current)
+        if self.all_samples is not None:
+            self.all_samples.append(self.current)
+        self.current = [0.0] * (len(PHASES) + 1)
+        self.frames += 1
+
+    # returns the mean seconds of every phase over the window
+    def averages(self) -> dict[str, float]:
+        count = max(len(self.samples), 1)
+        return {
+            phase: sum(sample[n] for sample in self.samples) / count
+            for n, phase in enumerate(PHASES)
+        }
+
+    # returns the p-th percentile of the frame times over the window, without
+    # the time waiting for the next frame if busy is set
+    def percentile(self, p: float, busy: bool = False) -> float:
+        end = len(PHASES) - 1 if busy else len(PHASES)
+        times = sorted(sum(sample[:end]) for sample in self.samples)
+        if not times:
+            return 0.0
+        return times[min(int(len(times) * p / 100), len(times) - 1)]
+
+    def steps_per_second(self) -> float:
+        seconds = sum(sum(sample[:-1]) for sample in self.samples)
+        steps = sum(sample[-1] for sample in self.samples)
+        return steps / seconds if seconds else 0.0
+
+    def write_csv(self, path: str):
+        assert self.all_samples is not None
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{phase}_ms" for phase in PHASES] + ["steps"])
+            for frame, sample in enumerate(self.all_samples):
+                writer.writerow(
+                    [frame]
+                    + [f"{seconds * 1000:.4f}" for seconds in sample[:-1]]
+                    + [int(sample[-1])]
+                )
+
+    # the text is rendered again only every 10 frames, rendering it costs more
+    # than most of the phases it shows
+    def draw(
+        self, surface: pygame.Surface, font: pygame.font.Font, topright: tuple[int, int]
+    ) -> pygame.Rect:
+        if self.overlay is None or self.frames % 10 == 0:
+            averages = self.averages()
+            lines = [f"{phase:>8} {averages[phase] * 1000:7.3f} ms" for phase in PHASES]
+            lines.append(f"{'p95':>8} {self.percentile(95) * 1000:7.3f} ms")
+            lines.append(f"{'p95 busy':>8} {self.percentile(95, True) * 1000:7.3f} ms")
+            lines.append(f"{'steps/s':>8} {self.steps_per_second():9.0f}")
+            self.overlay = render_lines(lines, font)
+
+        return surface.blit(self.overlay, self.overlay.get_rect(topright=topright))
+
+
+def render_lines(lines: list[str], font: pygame.font.Font) -> pygame.Surface:
+    height = font.get_linesize() + 2
+    rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+    width = max(text.get_width() for text in rendered)
+    overlay = pygame.Surface((width + 10, height * len(lines) + 10))
+    overlay.fill((40, 40, 40))
+    for n, text in enumerate(rendered):
+        overlay.blit(text, (5, 5 + n * height))
+    return overlay
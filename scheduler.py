@@ -0,0 +1,36 @@
+from time import perf_counter
+from typing import Callable
+
+
+class StepScheduler:
+    """
+    Decides how many steps of an algorithm run in every frame, it runs as many as
+    needed to reach steps_per_second but never spends more than frame_budget
+    seconds of a frame on them
+    """
+
+    def __init__(self, steps_per_second: float, frame_budget: float = 0.01):
+        self.steps_per_second = steps_per_second
+        self.frame_budget = frame_budget
+        self.pending = 0.0
+
+    def set_steps_per_second(self, steps_per_second: float):
+        self.steps_per_second = steps_per_second
+        self.pending = 0.0
+
+    # dt = seconds since the last frame, returns the number of steps done
+    def run(self, step: Callable[[], None], done: Callable[[], bool], dt: float) -> int:
+        self.pending += self.steps_per_second * dt
+        deadline = perf_counter() + self.frame_budget
+        steps = 0
+
+        while self.pending >= 1 and not done():
+            step()
+            steps += 1
+            self.pending -= 1
+            if perf_counter() > deadline:
+                break
+
+        # the steps that didn't fit in the budget are dropped instead of piling up
+        self.pending = min(self.pending, 1.0)
+        return steps
@@ -0,0 +1,122 @@
+from array import array
+
+import numpy as np
+
+
+class TreeIndex:
+    """
+    Path queries on a finished maze, which is a spanning tree of its cells, so
+    every pair of cells is joined by exactly one path. The tree is rooted at the
+    cell root and the lowest common ancestors are found with binary lifting:
+        parent[c]: cell before c in the path from root to c (root for root),
+        depth[c]: number of moves from root to c,
+        up[k][c]: ancestor 2 ** k levels above c (root if there isn't one),
+    """
+
+    def __init__(
+        self,
+        open_directions: bytearray,
+        direction_offsets: list[tuple[int, ...]],
+        root: int = 0,
+    ):
+        cell_count = len(open_directions)
+        parent = array("i", [root]) * cell_count
+        depth = array("i", bytes(4 * cell_count))
+        visited = bytearray(cell_count)
+        visited[root] = 1
+
+        queue = [root]
+        for cell in queue:
+            for offset in direction_offsets[open_directions[cell]]:
+                neighbour = cell + offset
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    parent[neighbour] = cell
+                    depth[neighbour] = depth[cell] + 1
+                    queue.append(neighbour)
+        assert len(queue) == cell_count, "the maze is not a spanning tree"
+
+        # every level is kept once, as an array for the one-pair queries and a
+        # numpy view over the same memory for the vectorized ones
+        self.root = root
+        self.parent_array = parent
+        self.depth_array = depth
+        self.parent = np.frombuffer(parent, dtype=np.int32)
+        self.depth = np.frombuffer(depth, dtype=np.int32)
+
+        # up[k] = up[k - 1][up[k - 1]] for every cell at once, up[0] is parent
+        self.up_arrays = [parent]
+        self.up = [self.parent]
+        for _ in range(1, max(int(self.depth.max()), 1).bit_length()):
+            level = array("i", bytes(4 * cell_count))
+            view = np.frombuffer(level, dtype=np.int32)
+            np.take(self.up[-1], self.up[-1], out=view)
+            self.up_arrays.append(level)
+            self.up.append(view)
+
+    def __len__(self) -> int:
+        return len(self.parent_array)
+
+    def lca(self, a: int, b: int) -> int:
+        depth = self.depth_array
+        if depth[a] < depth[b]:
+            a, b = b, a
+
+        diff = depth[a] - depth[b]
+        k = 0
+        while diff:
+            if diff & 1:
+                a = self.up_arrays[k][a]
+            diff >>= 1
+            k += 1
+        if a == b:
+            return a
+
+        for level in reversed(self.up_arrays):
+            if level[a] != level[b]:
+                a, b = level[a], level[b]
+        return self.parent_array[a]
+
+    def distance(self, a: int, b: int) -> int:
+        depth = self.depth_array
+        return depth[a] + depth[b] - 2 * depth[self.lca(a, b)]
+
+    # cell ids of the path from a to b, both included
+    def path(self, a: int, b: int) -> list[int]:
+        ancestor = self.lca(a, b)
+        parent = self.parent_array
+
+        from_a = [a]
+        while from_a[-1] != ancestor:
+            from_a.append(parent[from_a[-1]])
+        from_b = []
+        while b != ancestor:
+            from_b.append(b)
+            b = parent[b]
+        return from_a + from_b[::-1]
+
+    # lcas of the pairs (a[n], b[n]), climbing every pair at the same time
+    def lcas(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        a = np.array(a, dtype=np.int64)
+        b = np.array(b, dtype=np.int64)
+        swap = self.depth[a] < self.depth[b]
+        a[swap], b[swap] = b[swap], a[swap]
+
+        diff = self.depth[a] - self.depth[b]
+        for k, level in enumerate(self.up):
+            lift = (diff >> k & 1).astype(bool)
+            a[lift] = level[a[lift]]
+
+        for level in reversed(self.up):
+            differ = level[a] != level[b]
+            a[differ] = level[a[differ]]
+            b[differ] = level[b[differ]]
+        return np.where(a == b, a, self.parent[a])
+
+    def distances(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self.lcas(a, b)]
+
+    def paths(self, pairs: list[tuple[int, int]]) -> list[list[int]]:
+        return [self.path(a, b) for a, b in pairs]
@@ -8,6 +8,7 @@ class Algorithms(Enum):
     KRUSKAL = 1
     BORUVKA = 2
     PRIM_MAZE = 3
+    ELLER = 4
 
 
 class PathFinder:
@@ -30,3 +31,15 @@ class PathFinder:
         path_color: pygame.Color,
     ):
         raise NotImplementedError
+
+    # same as draw but writing the pixels directly, for small cell sizes
+    def draw_pixels(
+        self,
+        surface: pygame.Surface,
+        xnode_count: int,
+        cell_size: int,
+        rect: pygame.Rect,
+        visited_color: pygame.Color,
+        path_color: pygame.Color,
+    ):
+        raise NotImplementedError
@@ -1,25 +1,38 @@
 #!/bin/python3
 
+import argparse
 from enum import Enum
-from time import sleep
 
 import pygame
 
 from maze import Maze
-from pathfinders import Astar, Bfs, Dfs
-from utils import Algorithms
+from maze_file import load_maze, save_maze
+from pathfinders import (
+    Astar,
+    Bfs,
+    BidirectionalAstar,
+    BidirectionalBfs,
+    Dfs,
+    JunctionSolver,
+    TreeSolver,
+)
+from profiler import FrameProfiler
+from scheduler import StepScheduler
+from utils import Algorithms, PathFinder
 from widgets import Button, Scale
 
 pygame.init()
 
 WIDTH = 1000
 HEIGHT = 800
+FPS = 60
 pause = False
 
 window = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("maze_generator")
 
 public_pixel_font = pygame.font.Font("fonts/PublicPixel-z84yD.ttf", 14)
+profile_font = pygame.font.Font("fonts/PublicPixel-z84yD.ttf", 8)
 
 
 class State(Enum):
@@ -29,6 +42,9 @@ class State(Enum):
 
 state = State.CREATING
 drawing = False
+heatmap = False
+# file written and read by the save and load buttons
+maze_file = "saved.maze"
 draw: set[tuple[int, int]] = set()
 
 button_colors = {
@@ -46,6 +62,10 @@ MAZE_ALGS_POSX = 200
 PATHFINDER_POSX = 400
 SETTINGS_POSX = 600
 
+MAZE_AREA = pygame.Rect(0, 0, WIDTH, 530)
+MAZE_RECT = pygame.Rect(10, 10, WIDTH - 20, 500)
+PANEL_AREA = pygame.Rect(0, 530, WIDTH, HEIGHT - 530)
+
 
 def pause_continue(button: Button):
     global pause
@@ -63,40 +83,52 @@ def restart_maze(_: Button, maze: Maze):
     maze.restart()
 
 
+def skip_to_end(_: Button, maze: Maze):
+    if not maze.is_fully_created():
+        maze.generate_all()
+
+
 def change_generation_alg(_: Button, maze: Maze, alg: Algorithms):
     global state
     state = State.CREATING
     maze.set_generation_mode(alg)
 
 
-def solve_bfs(button: Button, maze: Maze):
+def select_path_finder(button: Button, maze: Maze, path_finder: PathFinder):
     global state
     state = State.SOLVING
+    for b in path_finder_buttons:
+        b.set_border_color(button_colors["border"])
     button.set_border_color(PINK)
-    dfs_button.set_border_color(button_colors["border"])
-    astar_button.set_border_color(button_colors["border"])
-    bfs = Bfs(maze)
-    maze.set_path_finder(bfs)
+    maze.set_path_finder(path_finder)
+
+
+def solve_bfs(button: Button, maze: Maze):
+    select_path_finder(button, maze, Bfs(maze))
 
 
 def solve_dfs(button: Button, maze: Maze):
-    global state
-    state = State.SOLVING
-    button.set_border_color(PINK)
-    bfs_button.set_border_color(button_colors["border"])
-    astar_button.set_border_color(button_colors["border"])
-    bfs = Dfs(maze)
-    maze.set_path_finder(bfs)
+    select_path_finder(button, maze, Dfs(maze))
 
 
 def solve_astar(button: Button, maze: Maze):
-    global state
-    state = State.SOLVING
-    button.set_border_color(PINK)
-    bfs_button.set_border_color(button_colors["border"])
-    dfs_button.set_border_color(button_colors["border"])
-    bfs = Astar(maze)
-    maze.set_path_finder(bfs)
+    select_path_finder(button, maze, Astar(maze))
+
+
+def solve_bidirectional_bfs(button: Button, maze: Maze):
+    select_path_finder(button, maze, BidirectionalBfs(maze))
+
+
+def solve_bidirectional_astar(button: Button, maze: Maze):
+    select_path_finder(button, maze, BidirectionalAstar(maze))
+
+
+def solve_junctions(button: Button, maze: Maze):
+    select_path_finder(button, maze, JunctionSolver(maze))
+
+
+def solve_tree(button: Button, maze: Maze):
+    select_path_finder(button, maze, TreeSolver(maze))
 
 
 def state_drawing(button: Button):
@@ -112,39 +144,90 @@ def state_drawing(button: Button):
         draw.clear()
 
 
-def draw_text():
-    mst = public_pixel_font.render("MST", True, (255, 255, 255))
-    window.blit(mst, (MST_ALGS_POSX, 550))
+def save_current_maze(_: Button, maze: Maze):
+    save_maze(maze, maze_file)
+    print(f"[INFO] maze saved in {maze_file}")
 
-    maze = public_pixel_font.render("MAZE", True, (255, 255, 255))
-    window.blit(maze, (MAZE_ALGS_POSX, 550))
 
-    pathfinders = public_pixel_font.render("Pathfinders", True, (255, 255, 255))
-    window.blit(pathfinders, (PATHFINDER_POSX, 550))
+def load_saved_maze(_: Button, current: Maze):
+    global maze, state, last_overlay
+    try:
+        maze = load_maze(maze_file, MAZE_RECT, current.color)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] can't load {maze_file}: {e}")
+        return
+
+    state = State.CREATING
+    size_scale.set_value(
+        min(max(maze.cell_size, size_scale.min_value), size_scale.max_value)
+    )
+    # the loaded maze can be smaller than the previous one
+    last_overlay = True
 
-    settings = public_pixel_font.render("Settings", True, (255, 255, 255))
-    window.blit(settings, (SETTINGS_POSX, 550))
 
-    change_size = public_pixel_font.render("cell size", True, (255, 255, 255))
-    window.blit(change_size, (SETTINGS_POSX + 175, 570))
+def toggle_heatmap(button: Button):
+    global heatmap
 
-    delay = public_pixel_font.render("delay (s)", True, (255, 255, 255))
-    window.blit(delay, (SETTINGS_POSX + 175, 625))
+    heatmap = not heatmap
+    if heatmap:
+        button.set_border_color(GREEN)
+    else:
+        button.set_border_color(button_colors["border"])
+
+
+# the titles of the panel never change, so they are rendered once in a surface
+# that is used as the background of the panel
+def render_panel_background() -> pygame.Surface:
+    background = pygame.Surface(PANEL_AREA.size)
+    titles = [
+        ("MST", (MST_ALGS_POSX, 550)),
+        ("MAZE", (MAZE_ALGS_POSX, 550)),
+        ("Pathfinders", (PATHFINDER_POSX, 550)),
+        ("Settings", (SETTINGS_POSX, 550)),
+        ("cell size", (SETTINGS_POSX + 175, 570)),
+        ("steps/s", (SETTINGS_POSX + 175, 625)),
+    ]
+    for title, (x, y) in titles:
+        text = public_pixel_font.render(title, True, (255, 255, 255))
+        background.blit(text, (x - PANEL_AREA.x, y - PANEL_AREA.y))
+    return background
 
 
 # To simulate pointers the maze is passed in a list
 def change_cell_size(scale: Scale):
     global maze
-    maze = Maze(maze.rect, int(scale.value), maze.max_cost, maze.color)
+    maze = Maze(MAZE_RECT, int(scale.value), maze.max_cost, maze.color)
     maze.draw_grid_points(window)
 
 
-def change_delay(scale: Scale):
-    global delay
-    delay = scale.value
+# the speed scale is logarithmic, its value is the exponent of the steps/s
+def steps_per_second(exponent: float) -> float:
+    return 10**exponent
+
+
+def format_speed(exponent: float) -> str:
+    steps = steps_per_second(exponent)
+    return f"{steps:.0f}" if steps < 1000 else f"{steps / 1000:.0f}k"
+
+
+def change_speed(scale: Scale):
+    scheduler.set_steps_per_second(steps_per_second(scale.value))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="visualizes MST and maze algorithms")
+    parser.add_argument(
+        "--profile-csv",
+        help="writes the time of every phase of every frame to this csv on exit",
+    )
+    parser.add_argument(
+        "--maze-file",
+        default=maze_file,
+        help="file written and read by the save and load buttons",
+    )
+    args = parser.parse_args()
+    maze_file = args.maze_file
+
     running = True
 
     # MST-Maze algorithms
@@ -180,9 +263,33 @@ if __name__ == "__main__":
         onClick=change_generation_alg,
     )
 
+    eller_button = Button(
+        pygame.Rect(MAZE_ALGS_POSX, 650, 150, 25),
+        public_pixel_font,
+        button_colors,
+        label="Eller",
+        onClick=change_generation_alg,
+    )
+
+    save_button = Button(
+        pygame.Rect(MAZE_ALGS_POSX, 700, 70, 25),
+        public_pixel_font,
+        button_colors,
+        label="Save",
+        onClick=save_current_maze,
+    )
+
+    load_button = Button(
+        pygame.Rect(MAZE_ALGS_POSX + 80, 700, 70, 25),
+        public_pixel_font,
+        button_colors,
+        label="Load",
+        onClick=load_saved_maze,
+    )
+
     # Pathfinding algorithms
     bfs_button = Button(
-        pygame.Rect(PATHFINDER_POSX, 600, 150, 25),
+        pygame.Rect(PATHFINDER_POSX, 575, 150, 25),
         public_pixel_font,
         button_colors,
         label="BFS",
@@ -190,7 +297,7 @@ if __name__ == "__main__":
     )
 
     dfs_button = Button(
-        pygame.Rect(PATHFINDER_POSX, 650, 150, 25),
+        pygame.Rect(PATHFINDER_POSX, 605, 150, 25),
         public_pixel_font,
         button_colors,
         label="DFS",
@@ -198,13 +305,55 @@ if __name__ == "__main__":
     )
 
     astar_button = Button(
-        pygame.Rect(PATHFINDER_POSX, 700, 150, 25),
+        pygame.Rect(PATHFINDER_POSX, 635, 150, 25),
         public_pixel_font,
         button_colors,
         label="A*",
         onClick=solve_astar,
     )
 
+    bidirectional_bfs_button = Button(
+        pygame.Rect(PATHFINDER_POSX, 665, 150, 25),
+        public_pixel_font,
+        button_colors,
+        label="Bi-BFS",
+        onClick=solve_bidirectional_bfs,
+    )
+
+    bidirectional_astar_button = Button(
+        pygame.Rect(PATHFINDER_POSX, 695, 150, 25),
+        public_pixel_font,
+        button_colors,
+        label="Bi-A*",
+        onClick=solve_bidirectional_astar,
+    )
+
+    junctions_button = Button(
+        pygame.Rect(PATHFINDER_POSX, 725, 150, 25),
+        public_pixel_font,
+        button_colors,
+        label="Junctions",
+        onClick=solve_junctions,
+    )
+
+    tree_button = Button(
+        pygame.Rect(PATHFINDER_POSX, 755, 150, 25),
+        public_pixel_font,
+        button_colors,
+        label="Tree index",
+        onClick=solve_tree,
+    )
+
+    path_finder_buttons = [
+        bfs_button,
+        dfs_button,
+        astar_button,
+        bidirectional_bfs_button,
+        bidirectional_astar_button,
+        junctions_button,
+        tree_button,
+    ]
+
     # Control buttons
     pause_button = Button(
         pygame.Rect(SETTINGS_POSX, 600, 150, 25),
@@ -232,8 +381,24 @@ if __name__ == "__main__":
         onClick=state_drawing,
     )
 
+    skip_button = Button(
+        pygame.Rect(SETTINGS_POSX, 750, 170, 25),
+        public_pixel_font,
+        button_colors,
+        label="Skip to end",
+        onClick=skip_to_end,
+    )
+
+    heatmap_button = Button(
+        pygame.Rect(SETTINGS_POSX + 175, 700, 150, 25),
+        public_pixel_font,
+        button_colors,
+        label="Heatmap",
+        onClick=toggle_heatmap,
+    )
+
     size_scale = Scale(
-        20,
+        2,
         50,
         100,
         (SETTINGS_POSX + 175, 600),
@@ -242,29 +407,40 @@ if __name__ == "__main__":
         onClick=change_cell_size,
     )
 
-    delay_scale = Scale(
+    speed_scale = Scale(
         0,
-        0.1,
+        5,
         100,
         (SETTINGS_POSX + 175, 650),
         7,
         public_pixel_font,
-        onClick=change_delay,
+        onClick=change_speed,
         padding=23,
+        label_format=format_speed,
     )
 
-    delay_scale.set_value(0.02)
+    speed_scale.set_value(2)
 
-    maze = Maze(
-        pygame.Rect(10, 10, WIDTH - 20, 500), int(size_scale.value), max_cost=1000
-    )
+    maze = Maze(MAZE_RECT, int(size_scale.value), max_cost=1000)
 
-    delay = delay_scale.value
+    scheduler = StepScheduler(steps_per_second(speed_scale.value))
+    clock = pygame.time.Clock()
+    dt = 0.0
+    last_overlay = False
+    panel_background = render_panel_background()
+    # F3 shows the time spent in every phase of the frame
+    profiler = FrameProfiler(keep_all=args.profile_csv is not None)
+    show_profile = False
 
     while running:
+        steps = 0
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_profile = not show_profile
+                # the maze under the overlay has to be drawn again
+                last_overlay = True
 
         if drawing:
             mouse_pos = pygame.mouse.get_pos()
@@ -288,26 +464,27 @@ if __name__ == "__main__":
                         draw.remove((x, y))
                     except KeyError:
                         pass
-
-            for x, y in draw:
-                pygame.draw.rect(window, RED, (x, y, maze.cell_size, maze.cell_size))
+        profiler.mark("events")
 
         if not maze.is_fully_created() and not pause:
-            bfs_button.set_active(False)
-            dfs_button.set_active(False)
-            astar_button.set_active(False)
+            for button in path_finder_buttons:
+                button.set_active(False)
             draw_button.set_active(False)
-            maze.new_wall()
-            sleep(delay)
-        elif maze.generation_mode == Algorithms.PRIM_MAZE and maze.is_fully_created():
-            bfs_button.set_active(True)
-            dfs_button.set_active(True)
-            astar_button.set_active(True)
+            heatmap_button.set_active(False)
+            save_button.set_active(False)
+            steps = scheduler.run(maze.new_wall, maze.is_fully_created, dt)
+            profiler.mark("generate")
+        elif maze.is_solvable():
+            for button in path_finder_buttons:
+                button.set_active(True)
             draw_button.set_active(True)
-            if state == State.SOLVING and not pause:
-                maze.solve_step()
-            maze.draw_solution(window)
-            sleep(delay)
+            heatmap_button.set_active(True)
+            save_button.set_active(True)
+            if state == State.SOLVING and not pause and maze.path_finder is not None:
+                steps = scheduler.run(
+                    maze.solve_step, maze.path_finder.has_finished, dt
+                )
+                profiler.mark("solve")
 
         match maze.generation_mode:
             case Algorithms.KRUSKAL:
@@ -315,24 +492,35 @@ if __name__ == "__main__":
                 prim_button.set_border_color(button_colors["border"])
                 boruvka_button.set_border_color(button_colors["border"])
                 prim_maze_button.set_border_color(button_colors["border"])
+                eller_button.set_border_color(button_colors["border"])
 
             case Algorithms.PRIM:
                 prim_button.set_border_color(GREEN)
                 kruskal_button.set_border_color(button_colors["border"])
                 boruvka_button.set_border_color(button_colors["border"])
                 prim_maze_button.set_border_color(button_colors["border"])
+                eller_button.set_border_color(button_colors["border"])
 
             case Algorithms.BORUVKA:
                 boruvka_button.set_border_color(GREEN)
                 kruskal_button.set_border_color(button_colors["border"])
                 prim_button.set_border_color(button_colors["border"])
                 prim_maze_button.set_border_color(button_colors["border"])
+                eller_button.set_border_color(button_colors["border"])
 
             case Algorithms.PRIM_MAZE:
                 prim_maze_button.set_border_color(GREEN)
                 kruskal_button.set_border_color(button_colors["border"])
                 prim_button.set_border_color(button_colors["border"])
                 boruvka_button.set_border_color(button_colors["border"])
+                eller_button.set_border_color(button_colors["border"])
+
+            case Algorithms.ELLER:
+                eller_button.set_border_color(GREEN)
+                kruskal_button.set_border_color(button_colors["border"])
+                prim_button.set_border_color(button_colors["border"])
+                boruvka_button.set_border_color(button_colors["border"])
+                prim_maze_button.set_border_color(button_colors["border"])
 
         pause_button.process()
         restart_button.process(maze)
@@ -340,31 +528,75 @@ if __name__ == "__main__":
         prim_button.process(maze, Algorithms.PRIM)
         boruvka_button.process(maze, Algorithms.BORUVKA)
         prim_maze_button.process(maze, Algorithms.PRIM_MAZE)
-        bfs_button.process(maze)
-        dfs_button.process(maze)
-        astar_button.process(maze)
+        eller_button.process(maze, Algorithms.ELLER)
+        save_button.process(maze)
+        load_button.process(maze)
+        for button in path_finder_buttons:
+            button.process(maze)
         draw_button.process()
+        skip_button.process(maze)
+        heatmap_button.process()
 
         size_scale.process()
-        delay_scale.process()
-
-        maze.draw_maze(window)
+        speed_scale.process()
+        profiler.mark("widgets")
+
+        # the maze is redrawn entirely only while something is drawn over it,
+        # otherwise only the parts that changed are copied to the window
+        maze_finished = maze.is_solvable()
+        overlay = drawing or (
+            maze_finished and (maze.path_finder is not None or heatmap)
+        )
+        if overlay or last_overlay:
+            window.fill((0, 0, 0), MAZE_AREA)
+            if maze_finished and heatmap:
+                maze.draw_heatmap(window)
+            for x, y in draw:
+                pygame.draw.rect(window, RED, (x, y, maze.cell_size, maze.cell_size))
+            profiler.mark("maze")
+            if overlay:
+                maze.draw_solution(window)
+                profiler.mark("solution")
+            maze.draw_maze(window)
+            dirty = [MAZE_AREA]
+        else:
+            dirty = maze.draw_maze(window, full=False)
+        last_overlay = overlay
+        profiler.mark("maze")
+
+        window.blit(panel_background, PANEL_AREA)
         pause_button.draw(window)
         restart_button.draw(window)
         kruskal_button.draw(window)
         boruvka_button.draw(window)
         prim_button.draw(window)
         prim_maze_button.draw(window)
-        bfs_button.draw(window)
-        dfs_button.draw(window)
-        astar_button.draw(window)
+        eller_button.draw(window)
+        save_button.draw(window)
+        load_button.draw(window)
+        for button in path_finder_buttons:
+            button.draw(window)
         draw_button.draw(window)
+        skip_button.draw(window)
+        heatmap_button.draw(window)
 
         size_scale.draw(window)
-        delay_scale.draw(window)
-        draw_text()
-
-        pygame.display.update()
-        window.fill((0, 0, 0))
+        speed_scale.draw(window)
+        dirty.append(PANEL_AREA)
+
+        if show_profile:
+            dirty.append(
+                profiler.draw(window, profile_font, (MAZE_AREA.right - 10, 10))
+            )
+        profiler.mark("panel")
+
+        pygame.display.update(dirty)
+        profiler.mark("update")
+        dt = clock.tick(FPS) / 1000
+        profiler.mark("wait")
+        profiler.end_frame(steps)
+
+    if args.profile_csv is not None:
+        profiler.write_csv(args.profile_csv)
 
     pygame.quit()
@@ -0,0 +1,118 @@
+import numpy as np
+import pygame
+
+
+class BitGrid:
+    """
+    rows x columns grid of bits packed 8 per byte (the bit j of a row is the bit
+    j % 8 of its byte j // 8), every row starts on a new byte so rows can be
+    read and written on their own
+    """
+
+    def __init__(self, rows: int, columns: int, buffer=None):
+        self.rows = rows
+        self.columns = columns
+        self.stride = (columns + 7) // 8
+        self.buffer = buffer if buffer is not None else bytearray(rows * self.stride)
+        assert len(self.buffer) == rows * self.stride
+
+    def __getitem__(self, pos: tuple[int, int]) -> bool:
+        return bool(
+            self.buffer[pos[0] * self.stride + (pos[1] >> 3)] >> (pos[1] & 7) & 1
+        )
+
+    def set(self, i: int, j: int):
+        self.buffer[i * self.stride + (j >> 3)] |= 1 << (j & 7)
+
+    def clear(self, i: int, j: int):
+        self.buffer[i * self.stride + (j >> 3)] &= ~(1 << (j & 7)) & 0xFF
+
+    def fill(self):
+        row = ((1 << self.columns) - 1).to_bytes(self.stride, "little")
+        self.buffer[:] = row * self.rows
+
+    # returns a rows x columns numpy bool array with a copy of the bits
+    def to_array(self) -> np.ndarray:
+        packed = np.frombuffer(self.buffer, dtype=np.uint8).reshape(
+            self.rows, self.stride
+        )
+        bits = np.unpackbits(packed, axis=1, bitorder="little")
+        return bits[:, : self.columns].astype(bool)
+
+
+# bits of MazeWalls.open_directions, in the order the solvers try the moves
+DOWN = 1
+UP = 2
+RIGHT = 4
+LEFT = 8
+
+
+class MazeWalls:
+    """
+    Walls of a maze with rows x columns cells, stored as two bit grids:
+        horizontal[i, j]: wall over the cell (i, j), (rows + 1) x columns bits,
+        vertical[i, j]: wall on the left of the cell (i, j), rows x (columns + 1) bits,
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        columns: int,
+        horizontal: BitGrid | None = None,
+        vertical: BitGrid | None = None,
+    ):
+        self.rows = rows
+        self.columns = columns
+        self.horizontal = (
+            horizontal if horizontal is not None else BitGrid(rows + 1, columns)
+        )
+        self.vertical = vertical if vertical is not None else BitGrid(rows, columns + 1)
+
+    # puts every wall up
+    def fill(self):
+        self.horizontal.fill()
+        self.vertical.fill()
+
+    # cell = i, j coords of the cell (i = row, j = column), the cells must be adjacent
+    def theres_wall(self, cell1: tuple[int, int], cell2: tuple[int, int]) -> bool:
+        if cell1[1] == cell2[1]:
+            return self.horizontal[max(cell1[0], cell2[0]), cell1[1]]
+        return self.vertical[cell1[0], max(cell1[1], cell2[1])]
+
+    # returns a bytearray with a DOWN | UP | RIGHT | LEFT mask per cell id (cells
+    # numbered row by row) with the moves that don't cross a wall or leave the maze
+    def open_directions(self) -> bytearray:
+        horizontal = ~self.horizontal.to_array()
+        vertical = ~self.vertical.to_array()
+        directions = np.zeros((self.rows, self.columns), dtype=np.uint8)
+        directions[:-1, :] |= horizontal[1:-1, :] * np.uint8(DOWN)
+        directions[1:, :] |= horizontal[1:-1, :] * np.uint8(UP)
+        directions[:, :-1] |= vertical[:, 1:-1] * np.uint8(RIGHT)
+        directions[:, 1:] |= vertical[:, 1:-1] * np.uint8(LEFT)
+        return bytearray(directions.tobytes())
+
+    # node = i, j coords of a corner of the cells
+    def touches_node(self, i: int, j: int) -> bool:
+        return (
+            (j > 0 and self.horizontal[i, j - 1])
+            or (j < self.columns and self.horizontal[i, j])
+            or (i > 0 and self.vertical[i - 1, j])
+            or (i < self.rows and self.vertical[i, j])
+        )
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        cell_size: int,
+        rect: pygame.Rect,
+        color: pygame.Color,
+    ):
+        for i, j in np.argwhere(self.horizontal.to_array()).tolist():
+            from_node = j * cell_size + rect.x, i * cell_size + rect.y
+            to_node = (j + 1) * cell_size + rect.x, i * cell_size + rect.y
+            pygame.draw.line(surface, color, from_node, to_node)
+
+        for i, j in np.argwhere(self.vertical.to_array()).tolist():
+            from_node = j * cell_size + rect.x, i * cell_size + rect.y
+            to_node = j * cell_size + rect.x, (i + 1) * cell_size + rect.y
+            pygame.draw.line(surface, color, from_node, to_node)
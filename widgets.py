@@ -32,6 +32,9 @@ class Button:
         self.was_clicked = False
         self.hovered = False
         self.active = True
+        # rendered label and the (label, color) it was rendered with
+        self.label_surface: pygame.Surface | None = None
+        self.rendered: tuple[str, tuple[int, int, int]] | None = None
 
     def set_active(self, active: bool):
         self.active = active
@@ -70,7 +73,7 @@ class Button:
         pygame.draw.rect(surface, self.colors["border"], self.rect, self.border_width)
 
         if self.active:
-            label = self.font.render(self.label, True, self.colors["fg"])
+            label = self.get_label_surface()
             surface.blit(
                 label,
                 (
@@ -79,6 +82,14 @@ class Button:
                 ),
             )
 
+    # the label is rendered again only when its text or color change
+    def get_label_surface(self) -> pygame.Surface:
+        key = self.label, self.colors["fg"]
+        if self.label_surface is None or self.rendered != key:
+            self.rendered = key
+            self.label_surface = self.font.render(self.label, True, self.colors["fg"])
+        return self.label_surface
+
     def process(self, *args):
         if not self.active:
             return
@@ -117,6 +128,7 @@ class Scale:
         font: pygame.font.Font,
         padding: float = 10,
         onClick: Callable | None = None,
+        label_format: Callable[[float], str] = lambda value: f"{value:.2f}",
         colors: dict[str, tuple[int, int, int]] = {
             "fill": (0, 184, 255),
             "line": (255, 255, 255),
@@ -135,8 +147,9 @@ class Scale:
         self.font = font
         self.padding = padding
         self.onClick = onClick
+        self.label_format = label_format
 
-        label = font.render(f"{self.max_value:.2f}", True, colors["fg"])
+        label = font.render(label_format(self.max_value), True, colors["fg"])
         self.margin = label.get_width(), font.get_height() / 2
         del label
 
@@ -152,6 +165,9 @@ class Scale:
         )
 
         self.value = self.min_value + (self.max_value - self.min_value) * self.scale
+        # rendered value and the (value, color) it was rendered with
+        self.label_surface: pygame.Surface | None = None
+        self.rendered: tuple[float, tuple[int, int, int]] | None = None
 
     def set_active(self, active: bool):
         self.active = active
@@ -175,12 +191,20 @@ class Scale:
             self.pos[1] + self.margin[1],
         )
 
+    # the value is rendered again only when it or its color change
+    def get_label_surface(self) -> pygame.Surface:
+        key = self.value, self.colors["fg"]
+        if self.label_surface is None or self.rendered != key:
+            self.rendered = key
+            self.label_surface = self.font.render(
+                self.label_format(self.value),
+                True,
+                self.colors["fg"],
+            )
+        return self.label_surface
+
     def draw(self, surface: pygame.Surface):
-        label = self.font.render(
-            f"{self.value:.2f}",
-            True,
-            self.colors["fg"],
-        )
+        label = self.get_label_surface()
         surface.blit(label, self.pos)
 
         pygame.draw.line(